@@ -0,0 +1,306 @@
+# Append-only actuation log
+#
+# Every servo command is stored as a fixed-size 32 byte record:
+#
+#   timestamp   float64  wall clock seconds
+#   servo       uint32   crc32 of the servo id
+#   requested   float32  requested angle
+#   actual      float32  angle actually applied
+#   latency_us  uint32   command received -> hardware write done
+#   source      uint8    SOURCES code
+#   success     uint8
+#
+# Records are appended to segment files of SEGMENT_RECORDS records by a
+# background writer, so logging never blocks the command path. Next to each
+# segment an index file holds the (min, max) timestamp of every block of
+# INDEX_BLOCK records; queries mmap the segment and only unpack blocks whose
+# time range overlaps the query.
+
+import mmap
+import os
+import queue
+import re
+import struct
+import threading
+import time
+import zlib
+
+from backend.log import get_logger
+
+logger = get_logger('actuation')
+
+RECORD = struct.Struct('<dIffIBB6x')
+INDEX_ENTRY = struct.Struct('<dd')
+INDEX_BLOCK = 1024
+
+SOURCES = ['unknown', 'api', 'socketio', 'batch', 'sweep', 'center', 'init', 'config', 'shutdown', 'vision']
+SOURCE_CODES = {name: code for code, name in enumerate(SOURCES)}
+
+SEGMENT_PATTERN = re.compile(r'^segment-(\d{6})\.bin$')
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def servo_key(servo_id):
+    """32-bit key stored in place of the servo id string"""
+    return zlib.crc32(servo_id.encode('utf-8'))
+
+
+class Segment:
+    """One segment file and its block time index"""
+
+    def __init__(self, directory, number):
+        self.number = number
+        self.path = os.path.join(directory, f"segment-{number:06d}.bin")
+        self.index_path = os.path.join(directory, f"segment-{number:06d}.idx")
+
+    def record_count(self):
+        try:
+            return os.path.getsize(self.path) // RECORD.size
+        except OSError:
+            return 0
+
+    def load_index(self, repair=False):
+        """
+        Block (min_ts, max_ts) list, including the trailing partial block
+        Blocks missing from the index file are scanned from the records; with
+        repair=True (writer only) the index file is rewritten as well.
+        """
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            data = b''
+        torn = len(data) % INDEX_ENTRY.size
+        blocks = list(INDEX_ENTRY.iter_unpack(data[:len(data) - torn]))
+
+        count = self.record_count()
+        complete = count // INDEX_BLOCK
+        if len(blocks) != complete or torn:
+            if repair:
+                return self.rebuild_index()
+            blocks = blocks[:complete] + [self._scan_block(i) for i in range(len(blocks), complete)]
+        if count % INDEX_BLOCK:
+            blocks.append(self._scan_block(complete))
+        return blocks
+
+    def rebuild_index(self):
+        """Recreate the index file from the records, e.g. after a crash"""
+        count = self.record_count()
+        complete = count // INDEX_BLOCK
+        blocks = [self._scan_block(i) for i in range(complete)]
+        with open(self.index_path, 'wb') as f:
+            for block in blocks:
+                f.write(INDEX_ENTRY.pack(*block))
+        if count % INDEX_BLOCK:
+            blocks.append(self._scan_block(complete))
+        return blocks
+
+    def _scan_block(self, block):
+        with open(self.path, 'rb') as f:
+            f.seek(block * INDEX_BLOCK * RECORD.size)
+            data = f.read(INDEX_BLOCK * RECORD.size)
+        data = data[:len(data) - len(data) % RECORD.size]
+        timestamps = [record[0] for record in RECORD.iter_unpack(data)]
+        return (min(timestamps), max(timestamps))
+
+
+class ActuationLog:
+    """
+    Segmented binary log of servo commands with time-range queries
+
+    record() only enqueues; a writer thread appends records in batches.
+    """
+
+    def __init__(self, directory, segment_records=1000000, max_segments=20):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.max_segments = max_segments
+        self.queue = queue.SimpleQueue()
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()   # Guards the open segment files (rotate / stop)
+        self.segment = None
+        self.file = None
+        self.index_file = None
+        self.count = 0
+        self.block_min = None
+        self.block_max = None
+        self.dropped = 0
+
+    # Writing
+
+    def start(self):
+        if self.running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        segments = self.list_segments()
+        if segments and segments[-1].record_count() < self.segment_records:
+            self._open_segment(segments[-1])
+        else:
+            self._open_segment(Segment(self.directory, segments[-1].number + 1 if segments else 1))
+        self.running = True
+        self.thread = threading.Thread(target=self._writer_loop, name='actuation-log', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.queue.put(None)
+        self.thread.join(timeout=2.0)
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.index_file.close()
+                self.file = self.index_file = None
+
+    def record(self, servo_id, source, requested, actual, latency, success=True, timestamp=None):
+        """Queue one actuation record (latency in seconds)"""
+        if not self.running:
+            return
+        self.queue.put((
+            time.time() if timestamp is None else timestamp,
+            servo_key(str(servo_id)),
+            _as_float(requested),
+            _as_float(actual),
+            min(0xFFFFFFFF, max(0, int(latency * 1e6))),
+            SOURCE_CODES.get(source, 0),
+            1 if success else 0
+        ))
+
+    def _open_segment(self, segment):
+        """Open a segment for appending, dropping any torn record at its end"""
+        size = os.path.getsize(segment.path) if os.path.exists(segment.path) else 0
+        if size % RECORD.size:
+            with open(segment.path, 'r+b') as f:
+                f.truncate(size - size % RECORD.size)
+        blocks = segment.load_index(repair=True) if size else []
+        self.segment = segment
+        self.file = open(segment.path, 'ab')
+        self.count = segment.record_count()
+        self.index_file = open(segment.index_path, 'ab')
+        if self.count % INDEX_BLOCK:
+            self.block_min, self.block_max = blocks[-1]
+        else:
+            self.block_min = self.block_max = None
+
+    def _rotate(self):
+        with self.lock:
+            self.file.close()
+            self.index_file.close()
+            self._open_segment(Segment(self.directory, self.segment.number + 1))
+            segments = self.list_segments()
+            for old in segments[:max(0, len(segments) - self.max_segments)]:
+                for path in (old.path, old.index_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    def _writer_loop(self):
+        while True:
+            item = self.queue.get()
+            batch = [item]
+            # Drain whatever else is queued so records are written in batches
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch([record for record in batch if record is not None])
+            except Exception as e:
+                self.dropped += len(batch)
+                logger.error("Failed to write actuation log: %s", e)
+            if None in batch:
+                return
+
+    def _write_batch(self, records):
+        for record in records:
+            if self.count >= self.segment_records:
+                self._rotate()
+            self.file.write(RECORD.pack(*record))
+            timestamp = record[0]
+            self.block_min = timestamp if self.block_min is None else min(self.block_min, timestamp)
+            self.block_max = timestamp if self.block_max is None else max(self.block_max, timestamp)
+            self.count += 1
+            if self.count % INDEX_BLOCK == 0:
+                # Records must be on disk before the index claims them
+                self.file.flush()
+                self.index_file.write(INDEX_ENTRY.pack(self.block_min, self.block_max))
+                self.index_file.flush()
+                self.block_min = self.block_max = None
+        self.file.flush()
+
+    # Reading
+
+    def list_segments(self):
+        if not os.path.isdir(self.directory):
+            return []
+        numbers = sorted(
+            int(match.group(1)) for match in map(SEGMENT_PATTERN.match, os.listdir(self.directory)) if match
+        )
+        return [Segment(self.directory, number) for number in numbers]
+
+    def query(self, servo_id, start=None, end=None, limit=1000):
+        """
+        Records for a servo with start <= timestamp <= end, oldest first
+        When more than `limit` match, the newest `limit` are returned.
+        """
+        if limit < 1:
+            return []
+        key = servo_key(servo_id)
+        start = float('-inf') if start is None else start
+        end = float('inf') if end is None else end
+
+        results = []
+        for segment in self.list_segments():
+            try:
+                results.extend(self._query_segment(segment, key, start, end))
+            except (OSError, ValueError):
+                continue  # Segment removed by retention while querying
+            if len(results) > limit:
+                results = results[-limit:]
+        results.sort(key=lambda record: record[0])
+        return [self._to_dict(record) for record in results[-limit:]]
+
+    def _query_segment(self, segment, key, start, end):
+        blocks = segment.load_index()
+        wanted = [i for i, (block_min, block_max) in enumerate(blocks) if block_max >= start and block_min <= end]
+        if not wanted:
+            return
+        with open(segment.path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            size -= size % RECORD.size
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    for block in wanted:
+                        offset = block * INDEX_BLOCK * RECORD.size
+                        chunk = view[offset:min(size, offset + INDEX_BLOCK * RECORD.size)]
+                        for record in RECORD.iter_unpack(chunk):
+                            if record[1] == key and start <= record[0] <= end:
+                                yield record
+                        chunk.release()
+                finally:
+                    view.release()
+
+    @staticmethod
+    def _to_dict(record):
+        timestamp, _, requested, actual, latency_us, source, success = record
+        return {
+            'timestamp': timestamp,
+            'source': SOURCES[source] if source < len(SOURCES) else 'unknown',
+            'requested_angle': None if requested != requested else round(requested, 2),
+            'actual_angle': None if actual != actual else round(actual, 2),
+            'latency_ms': latency_us / 1000,
+            'success': bool(success)
+        }
@@ -0,0 +1,170 @@
+import threading
+import time
+
+from backend.log import get_logger
+
+logger = get_logger('controller')
+
+
+class ServoSlot:
+    """Pending target and write bookkeeping for one servo"""
+
+    def __init__(self):
+        self.target = None          # Newest angle not yet written
+        self.source = None          # Sender of the newest command
+        self.received_at = 0.0      # time.perf_counter() when the newest command arrived
+        self.pending = 0            # Commands merged into the pending target
+        self.seq = 0                # Sequence number of the newest submitted command
+        self.applied_seq = 0        # Sequence number covered by the last write
+        self.last_write = 0.0       # time.monotonic() of the last write
+        self.last_result = (False, None)
+        self.last_coalesced = 0     # Commands dropped in favour of the last write
+        self.coalesced_total = 0
+        self.writes = 0
+
+
+class CommandMailbox:
+    """
+    Latest-wins command mailbox with one slot per servo
+
+    submit() overwrites whatever target is still pending for the servo, and a
+    single dispatcher thread writes the newest target at most once per
+    `min_interval` seconds per servo. Under a burst of slider updates the number
+    of hardware writes is bounded by the servo rate instead of the client rate;
+    intermediate targets are counted as coalesced.
+
+    apply(servo_id, angle, source, received_at) performs the actual write.
+    """
+
+    def __init__(self, apply, min_interval):
+        self.apply = apply
+        self.min_interval = min_interval
+        self.slots = {}
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._dispatch_loop, name='servo-mailbox', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def submit(self, servo_id, angle, wait=True, timeout=1.0, source='api', received_at=None):
+        """
+        Queue a target angle for a servo, replacing any pending one
+        Returns: dict with success, angle, coalesced (commands merged into the
+        write that covered this one) and superseded (a newer command won)
+        """
+        return self.submit_many({servo_id: angle}, wait, timeout, source, received_at)[servo_id]
+    
+    def submit_many(self, angles, wait=True, timeout=1.0, source='api', received_at=None):
+        """
+        Queue target angles for several servos at once and wait for all of them
+        angles: dict of servo_id -> angle
+        received_at: time.perf_counter() when the command arrived (defaults to now)
+        Returns: dict of servo_id -> result as for submit()
+        """
+        if received_at is None:
+            received_at = time.perf_counter()
+        with self.cond:
+            tickets = {}
+            for servo_id, angle in angles.items():
+                slot = self.slots.setdefault(servo_id, ServoSlot())
+                slot.target = angle
+                slot.source = source
+                slot.received_at = received_at
+                slot.pending += 1
+                slot.seq += 1
+                tickets[servo_id] = (slot, slot.seq, angle, slot.pending - 1)
+            self.cond.notify_all()
+
+            if not wait:
+                return {
+                    servo_id: {'success': True, 'queued': True, 'angle': angle, 'coalesced': coalesced}
+                    for servo_id, (slot, ticket, angle, coalesced) in tickets.items()
+                }
+
+            self.cond.wait_for(
+                lambda: not self.running or all(slot.applied_seq >= ticket for slot, ticket, _, _ in tickets.values()),
+                timeout
+            )
+            results = {}
+            for servo_id, (slot, ticket, angle, _) in tickets.items():
+                if slot.applied_seq < ticket:
+                    error = 'Command mailbox stopped' if not self.running else 'Timed out waiting for servo'
+                    results[servo_id] = {'success': False, 'error': error, 'angle': angle}
+                    continue
+                success, actual_angle = slot.last_result
+                results[servo_id] = {
+                    'success': success,
+                    'angle': actual_angle,
+                    'coalesced': slot.last_coalesced,
+                    'superseded': slot.applied_seq > ticket
+                }
+            return results
+
+    def get_stats(self):
+        """Per-servo write and coalesced command counters"""
+        with self.cond:
+            return {
+                servo_id: {'writes': slot.writes, 'coalesced': slot.coalesced_total}
+                for servo_id, slot in self.slots.items()
+            }
+
+    def _take_due(self):
+        """Pop targets that may be written now, or return how long to wait for the next one"""
+        now = time.monotonic()
+        due = []
+        next_due = None
+        for servo_id, slot in self.slots.items():
+            if slot.target is None:
+                continue
+            ready_at = slot.last_write + self.min_interval
+            if ready_at <= now:
+                due.append((servo_id, slot, (slot.target, slot.source, slot.received_at), slot.pending, slot.seq))
+                slot.target = None
+                slot.pending = 0
+                slot.last_write = now
+            elif next_due is None or ready_at < next_due:
+                next_due = ready_at
+        return due, (None if next_due is None else next_due - now)
+
+    def _dispatch_loop(self):
+        while True:
+            with self.cond:
+                if not self.running:
+                    return
+                due, wait_time = self._take_due()
+                if not due:
+                    self.cond.wait(wait_time)
+                    continue
+
+            # Write outside the lock so new commands can be queued meanwhile
+            results = []
+            for servo_id, slot, command, pending, seq in due:
+                try:
+                    result = self.apply(servo_id, *command)
+                except Exception as e:
+                    logger.error("Mailbox write for servo %s failed: %s", servo_id, e)
+                    result = (False, None)
+                results.append((slot, result, pending, seq))
+
+            with self.cond:
+                for slot, result, pending, seq in results:
+                    slot.last_result = result
+                    slot.last_coalesced = pending - 1
+                    slot.coalesced_total += pending - 1
+                    slot.writes += 1
+                    slot.applied_seq = seq
+                self.cond.notify_all()
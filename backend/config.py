@@ -16,6 +16,8 @@ DEFAULT_SERVO_CONFIG = {
 }
 
 SERVO_CONFIG_FILE = 'servo_configs.json'  # File to save/load servo configurations
+CONFIG_WATCH_ENABLED = True               # Apply edits to the config file without a restart
+CONFIG_WATCH_DEBOUNCE = 0.2               # Seconds to wait for an editor to finish writing
 
 # Pre-configured servos (can be modified via web interface)
 SERVOS = {
@@ -31,6 +33,11 @@ SERVOS = {
     }
 }
 
+# Simulation (mock mode only)
+SIMULATE_HARDWARE = False        # Use the timing-accurate PCA9685/servo simulator instead of the instant mock
+SIMULATED_I2C_FREQUENCY = 100000 # I2C bus speed in Hz (100kHz standard, 400kHz fast mode)
+SIMULATED_SLEW_RATE = 600        # Servo speed in degrees per second (~0.1s/60° hobby servo)
+
 # Web Server Configuration
 HOST = '0.0.0.0'        # Server host (0.0.0.0 for all interfaces)
 PORT = 5000             # Server port
@@ -39,4 +46,63 @@ DEBUG = True           # Flask debug mode
 # Safety Configuration
 SAFE_SHUTDOWN_ANGLE = 90  # Angle to move to on shutdown
 MOVEMENT_DELAY = 0.02     # Minimum delay between movements (seconds)
-MAX_SERVOS = 16          # Maximum number of servos (PCA9685 limit)
\ No newline at end of file
+MAX_SERVOS = 16          # Maximum number of servos (PCA9685 limit)
+
+# Actuation Log (binary record of every servo command)
+ACTUATION_LOG_ENABLED = True
+ACTUATION_LOG_DIR = 'actuation_log'         # Directory for segment files
+ACTUATION_LOG_SEGMENT_RECORDS = 1000000     # Records per segment (32 bytes each)
+ACTUATION_LOG_MAX_SEGMENTS = 20             # Oldest segments are deleted beyond this
+
+# Webcam Streaming
+# Renditions from lowest to highest. Each is encoded once per frame, and only
+# while at least one viewer is subscribed to it. The camera is asked for the
+# highest resolution; rungs above what it actually delivers are upscaled, so
+# only add e.g. 'high': {'resolution': (1280, 720), 'quality': 85} for a camera
+# that captures 720p.
+WEBCAM_RENDITIONS = {
+    'low': {'resolution': (320, 240), 'quality': 60},
+    'medium': {'resolution': (640, 480), 'quality': 80},
+}
+WEBCAM_DEFAULT_RENDITION = 'medium'  # Starting point for viewers on 'auto'
+WEBCAM_SOURCE = 0                    # cv2.VideoCapture index, or 'synthetic' for a generated test pattern
+WEBCAM_FRAME_INTERVAL = 0.033        # Default seconds between frames per viewer (~30 FPS)
+WEBCAM_MAX_IN_FLIGHT = 2             # Unacknowledged Socket.IO frames before a viewer's frames are dropped
+WEBCAM_AUTO_WINDOW = 30              # Frames considered by auto rendition switching
+WEBCAM_AUTO_DOWNGRADE = 0.25         # Switch down when this fraction of the window was dropped
+WEBCAM_AUTO_UPGRADE_DELAY = 10.0     # Seconds without drops before switching up
+WEBCAM_RETRY_DELAY = 1.0             # First wait before reopening a failed camera while vision needs frames
+WEBCAM_RETRY_MAX_DELAY = 30.0        # The wait doubles after each failure up to this
+
+# Vision Pipeline (webcam frames -> detectors -> servo actions)
+VISION_ENABLED = False       # Capture frames and evaluate VISION_RULES while the server runs
+VISION_MAX_FPS = 10          # Frames analysed per second; newer frames replace ones not yet analysed
+VISION_PROCESS_WIDTH = 160   # Regions of interest are downscaled to at most this many pixels wide
+VISION_STALE_AFTER = 2.0     # Seconds without a webcam frame before the pipeline reports itself stale
+
+# Detectors run on a region of interest given as (x, y, width, height) fractions of the frame
+#   level: fraction of the region's rows darker ('dark') or brighter ('light') than threshold (0-255)
+#   color: fraction of the region's pixels between lower and upper (B, G, R)
+VISION_DETECTORS = {
+    'tank_level': {
+        'type': 'level',
+        'roi': (0.45, 0.1, 0.1, 0.8),
+        'threshold': 100,
+        'liquid': 'dark'
+    }
+}
+
+# Rules fire once when a detector value crosses above/below the mark and re-arm when it falls back
+#   action: 'open', 'close' or an angle in degrees
+VISION_RULES = [
+    {'detector': 'tank_level', 'above': 0.8, 'servo': 'servo_0', 'action': 'close', 'cooldown': 2.0}
+]
+
+# Logging Configuration
+LOG_LEVEL = 'INFO'         # Default level for all subsystems
+LOG_LEVELS = {             # Per-subsystem overrides (controller, api, webcam, health, server, vision, config)
+    'controller': 'INFO',
+}
+LOG_JSON = False           # One JSON object per line instead of plain text
+LOG_RATE_LIMIT_INTERVAL = 5.0  # Seconds per rate limit window (0 disables rate limiting)
+LOG_RATE_LIMIT_BURST = 20      # Repeats of the same message allowed per window
@@ -0,0 +1,145 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+
+from backend.log import get_logger
+
+logger = get_logger('config')
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_inotify():
+    """libc inotify functions, or None when not on Linux"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class ConfigWatcher:
+    """
+    Calls callback() when a file changes on disk
+
+    Watches the file's directory with inotify so editors that save by writing
+    a temp file and renaming it are picked up too. Bursts of events are
+    debounced into one callback. Falls back to polling the file's mtime where
+    inotify is not available.
+    """
+
+    def __init__(self, path, callback, debounce=0.2, poll_interval=1.0):
+        self.path = os.path.abspath(path)
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.running = False
+        self.thread = None
+        self._wake_r = self._wake_w = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._wake_r, self._wake_w = os.pipe()
+        fd = self._init_inotify()
+        if fd is None:
+            logger.info("inotify not available, polling %s for changes", self.path)
+            target, args = self._poll_loop, ()
+        else:
+            target, args = self._inotify_loop, (fd,)
+        self.thread = threading.Thread(target=target, args=args, name='config-watcher', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        os.write(self._wake_w, b'x')
+        self.thread.join(timeout=1.0)
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    def _init_inotify(self):
+        libc = _load_inotify()
+        if libc is None:
+            return None
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        directory = os.path.dirname(self.path).encode()
+        if libc.inotify_add_watch(fd, directory, IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def _file_events(self, fd):
+        """True if any pending inotify event concerns the watched file"""
+        name = os.path.basename(self.path)
+        matched = False
+        while True:
+            try:
+                data = os.read(fd, 4096)
+            except BlockingIOError:
+                return matched
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                event_name = data[offset:offset + length].rstrip(b'\0').decode(errors='replace')
+                offset += length
+                if event_name == name:
+                    matched = True
+
+    def _inotify_loop(self, fd):
+        try:
+            while self.running:
+                readable, _, _ = select.select([fd, self._wake_r], [], [])
+                if not self.running:
+                    return
+                if fd in readable and self._file_events(fd):
+                    # Wait for the burst of writes to settle
+                    while select.select([fd, self._wake_r], [], [], self.debounce)[0]:
+                        if not self.running:
+                            return
+                        self._file_events(fd)
+                    self._notify()
+        finally:
+            os.close(fd)
+
+    def _poll_loop(self):
+        last = self._stat()
+        while self.running:
+            if select.select([self._wake_r], [], [], self.poll_interval)[0]:
+                return
+            current = self._stat()
+            if current != last:
+                last = current
+                self._notify()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _notify(self):
+        start = time.perf_counter()
+        try:
+            self.callback()
+        except Exception as e:
+            logger.error("Config reload failed: %s", e)
+        logger.debug("Config reload handled in %.1f ms", (time.perf_counter() - start) * 1000)
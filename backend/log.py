@@ -0,0 +1,146 @@
+# Logging for the Multi-Servo Controller
+#
+# Log calls only put the record on a queue; formatting and the write to
+# stdout/journald happen on a background thread. Each subsystem logs to its
+# own "panel.<subsystem>" logger so levels can be set per subsystem in config.
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+import backend.config as config
+
+ROOT_LOGGER = 'panel'
+
+# Attributes present on every LogRecord, anything else came in through extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'suppressed'}
+
+_listener = None
+_handler = None
+_setup_lock = threading.Lock()
+
+
+def get_logger(subsystem):
+    """Get the logger for a subsystem (controller, api, webcam, health, server, ...)"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drop repeats of the same message beyond `burst` per `interval` seconds
+
+    Messages are keyed by logger and unformatted template, so "moved to %s°"
+    counts as one message whatever the angle. The number of dropped records is
+    attached to the next one that gets through.
+    """
+
+    def __init__(self, interval, burst):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if self.interval <= 0:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self.lock:
+            window_start, count, suppressed = self.windows.get(key, (now, 0, 0))
+            if now - window_start >= self.interval:
+                window_start, count = now, 0
+            if count >= self.burst:
+                self.windows[key] = (window_start, count, suppressed + 1)
+                return False
+            self.windows[key] = (window_start, count + 1, 0)
+        record.suppressed = suppressed
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread"""
+
+    def prepare(self, record):
+        return record
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s [%(name)s] %(message)s')
+
+    def format(self, record):
+        text = super().format(record)
+        if getattr(record, 'suppressed', 0):
+            text += f" ({record.suppressed} similar messages suppressed)"
+        return text
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, extra= fields are included as keys"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'subsystem': record.name.split('.', 1)[-1],
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(level=None, subsystem_levels=None, json_output=None):
+    """
+    Configure the panel loggers and start the background log writer
+    Arguments default to LOG_LEVEL, LOG_LEVELS and LOG_JSON in config.
+    Safe to call more than once, only the first call has an effect.
+    """
+    global _listener, _handler
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        level = level or config.LOG_LEVEL
+        subsystem_levels = subsystem_levels if subsystem_levels is not None else config.LOG_LEVELS
+        json_output = config.LOG_JSON if json_output is None else json_output
+
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(JSONFormatter() if json_output else TextFormatter())
+
+        log_queue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(log_queue)
+        handler.addFilter(RateLimitFilter(config.LOG_RATE_LIMIT_INTERVAL, config.LOG_RATE_LIMIT_BURST))
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level)
+        root.addHandler(handler)
+        _handler = handler
+        root.propagate = False
+        for subsystem, subsystem_level in subsystem_levels.items():
+            get_logger(subsystem).setLevel(subsystem_level)
+
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer"""
+    global _listener, _handler
+    with _setup_lock:
+        if _listener is not None:
+            logging.getLogger(ROOT_LOGGER).removeHandler(_handler)
+            _listener.stop()
+            _listener = _handler = None
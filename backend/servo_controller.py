@@ -1,3 +1,7 @@
+from backend.log import get_logger
+
+logger = get_logger('controller')
+
 # Try importing hardware-specific libraries
 try:
     from board import SCL, SDA
@@ -5,13 +9,35 @@ try:
     from adafruit_pca9685 import PCA9685
     HARDWARE_AVAILABLE = True
 except:
-    print("Hardware libraries not found - running in mock mode")
+    logger.warning("Hardware libraries not found - running in mock mode")
     HARDWARE_AVAILABLE = False
 
 import time
 import json
+import math
+import struct
+import threading
+import uuid
 import backend.config as config
 import os
+from backend.command_mailbox import CommandMailbox
+from backend.actuation_log import ActuationLog
+from backend.config_watcher import ConfigWatcher
+
+# PCA9685 registers
+LED0_ON_L = 0x06          # First LED register, each channel uses 4 (ON_L, ON_H, OFF_L, OFF_H)
+
+# Servo config fields
+REQUIRED_FIELDS = ['name', 'channel', 'min_angle', 'max_angle', 'min_pulse_us', 'max_pulse_us', 'default_angle']
+PULSE_FIELDS = ('min_pulse_us', 'max_pulse_us')
+NUMBER_FIELDS = ['min_angle', 'max_angle', 'min_pulse_us', 'max_pulse_us', 'default_angle']
+OPTIONAL_ANGLE_FIELDS = ['open_angle', 'close_angle']
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
 
 class MockPCA9685Channel:
     """Mock implementation of PCA9685 channel"""
@@ -34,18 +60,59 @@ class MultiServoController:
         self.i2c = None
         self.pca = None
         self.servos = {}
+        self._config_snapshot = None   # Config file text last loaded or saved
         self.servo_configs = self.load_servo_configs()
         self.initialized = False
         self.mock_mode = not HARDWARE_AVAILABLE
+        self.init_timings = {}
+        
+        # Streamed angle commands (sliders) go through a latest-wins mailbox
+        # that writes each servo at most once per MOVEMENT_DELAY
+        self.mailbox = CommandMailbox(self.set_angle, config.MOVEMENT_DELAY)
+        
+        # Record of every command, written in the background
+        self.actuation_log = ActuationLog(
+            config.ACTUATION_LOG_DIR,
+            segment_records=config.ACTUATION_LOG_SEGMENT_RECORDS,
+            max_segments=config.ACTUATION_LOG_MAX_SEGMENTS
+        )
+        
+        # State versioning: bumped on every position or configuration change.
+        # The epoch identifies this process so clients can detect restarts.
+        self.state_lock = threading.Lock()
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        self.servo_versions = {}
+        self.removed_versions = {}
+        self._payload_cache = {}
+        self.position_listeners = []
+        
+        # Edits to the config file are diffed and applied while running
+        self.config_lock = threading.RLock()
+        self.config_watcher = ConfigWatcher(
+            config.SERVO_CONFIG_FILE, self.reload_servo_configs, debounce=config.CONFIG_WATCH_DEBOUNCE
+        )
     
     def initialize(self):
         """Initialize I2C bus and PCA9685"""
+        self.init_timings = {}
         try:
-            if self.mock_mode:
+            start = time.perf_counter()
+            if self.mock_mode and config.SIMULATE_HARDWARE:
+                # Create simulated PCA9685 with I2C timing and servo slew
+                from backend.simulator import SimulatedI2CBus, SimulatedPCA9685
+                bus = SimulatedI2CBus(config.SIMULATED_I2C_FREQUENCY)
+                self.pca = SimulatedPCA9685(bus, slew_rate=config.SIMULATED_SLEW_RATE)
+                self.pca.frequency = config.PWM_FREQUENCY
+                for servo_config in self.servo_configs.values():
+                    self._configure_simulated_servo(servo_config)
+                self.initialized = True
+                logger.info("Multi-servo controller initialized in MOCK MODE with simulated hardware")
+            elif self.mock_mode:
                 # Create mock PCA9685 instance
                 self.pca = MockPCA9685()
                 self.initialized = True
-                print("Multi-servo controller initialized in MOCK MODE")
+                logger.info("Multi-servo controller initialized in MOCK MODE")
             else:
                 # Create I2C bus
                 self.i2c = busio.I2C(SCL, SDA)
@@ -55,33 +122,151 @@ class MultiServoController:
                 self.pca.frequency = config.PWM_FREQUENCY
                 
                 self.initialized = True
-                print(f"Multi-servo controller initialized with hardware")
+                logger.info("Multi-servo controller initialized with hardware")
+            self.init_timings['pca9685'] = time.perf_counter() - start
             
             # Initialize enabled servos
+            if config.ACTUATION_LOG_ENABLED:
+                self.actuation_log.start()
+            
+            start = time.perf_counter()
             self._initialize_servos()
-            print(f"Initialized {len(self.servos)} servos")
+            self.init_timings['servos'] = time.perf_counter() - start
+            self.mailbox.start()
+            logger.info("Initialized %d servos", len(self.servos))
             
         except Exception as e:
-            print(f"Failed to initialize servo controller: {e}")
+            logger.error("Failed to initialize servo controller: %s", e)
             self.initialized = False
             raise
     
+    def start_config_watcher(self):
+        """
+        Apply edits to the config file while running (CONFIG_WATCH_ENABLED)
+        Only call this in the process that serves commands: any other process
+        holds stale positions and would write them to the PCA9685 on a reload.
+        """
+        if config.CONFIG_WATCH_ENABLED:
+            self.config_watcher.start()
+    
+    def _configure_simulated_servo(self, servo_config):
+        """Give the simulated servo on the config's channel its pulse range"""
+        simulated = getattr(self.pca, 'servos', None)
+        if simulated is not None:
+            simulated[servo_config['channel']].configure(
+                servo_config['min_pulse_us'], servo_config['max_pulse_us']
+            )
+    
     def _initialize_servos(self):
-        """Initialize individual servos based on configuration"""
+        """
+        Initialize individual servos based on configuration
+        All default positions are sent to the PCA9685 in a single write
+        """
+        duty_cycles = {}
         for servo_id, servo_config in self.servo_configs.items():
             if servo_config.get('enabled', False):
                 try:
                     channel = self.pca.channels[servo_config['channel']]
+                    angle, pulse_us = self._angle_to_pulse(servo_config, servo_config['default_angle'])
+                    duty_cycles[servo_config['channel']] = self._pulse_to_duty_cycle(pulse_us)
                     self.servos[servo_id] = {
                         'channel': channel,
                         'config': servo_config,
-                        'current_position': servo_config['default_angle']
+                        'current_position': angle
                     }
-                    # Set to default position
-                    self._set_servo_angle(servo_id, servo_config['default_angle'])
-                    print(f"Initialized {servo_config['name']} on channel {servo_config['channel']}")
                 except Exception as e:
-                    print(f"Failed to initialize servo {servo_id}: {e}")
+                    logger.error("Failed to initialize servo %s: %s", servo_id, e)
+        
+        # Set all servos to their default position
+        start = time.perf_counter()
+        self._write_channel_block(duty_cycles)
+        latency = time.perf_counter() - start
+        for servo_id, servo in self.servos.items():
+            self._touch(servo_id)
+            self.actuation_log.record(
+                servo_id, 'init', servo['config']['default_angle'], servo['current_position'], latency
+            )
+    
+    def _write_channel_block(self, duty_cycles):
+        """
+        Write several channels in one I2C transaction
+        duty_cycles: dict of channel index -> 16-bit duty cycle
+        
+        Uses the PCA9685 register auto-increment (enabled by the adafruit driver
+        when the frequency is set) to write the LEDn registers from the lowest to
+        the highest channel as one block. Channels in between are read first and
+        written back unchanged.
+        """
+        if not duty_cycles:
+            return
+        if isinstance(self.pca, MockPCA9685):
+            for index, duty_cycle in duty_cycles.items():
+                self.pca.channels[index].duty_cycle = duty_cycle
+            return
+        
+        first, last = min(duty_cycles), max(duty_cycles)
+        register = LED0_ON_L + 4 * first
+        block = bytearray(4 * (last - first + 1))
+        with self.pca.i2c_device as i2c:
+            if len(duty_cycles) < last - first + 1:
+                i2c.write_then_readinto(bytes([register]), block)
+            for index, duty_cycle in duty_cycles.items():
+                if duty_cycle == 0xFFFF:
+                    on, off = 0x1000, 0
+                else:
+                    # Same 16-bit to 12-bit conversion as adafruit PWMChannel.duty_cycle
+                    on, off = 0, (duty_cycle + 1) >> 4
+                struct.pack_into('<HH', block, 4 * (index - first), on, off)
+            i2c.write(bytes([register]) + block)
+    
+    def _touch(self, servo_id, removed=False):
+        """Record a change to a servo and bump the state version"""
+        with self.state_lock:
+            self.version += 1
+            if removed:
+                self.servo_versions.pop(servo_id, None)
+                self.removed_versions[servo_id] = self.version
+            else:
+                self.servo_versions[servo_id] = self.version
+                self.removed_versions.pop(servo_id, None)
+            self._payload_cache.clear()
+        
+        if self.position_listeners:
+            if removed:
+                positions = {servo_id: None}
+            elif servo_id in self.servos:
+                positions = {servo_id: self.servos[servo_id]['current_position']}
+            else:
+                return
+            for listener in self.position_listeners:
+                try:
+                    listener(positions)
+                except Exception as e:
+                    logger.warning("Position listener failed: %s", e)
+    
+    def add_position_listener(self, listener):
+        """
+        Call listener({servo_id: angle}) after any change to a running servo,
+        whatever its source (API, mailbox, sweep, vision, config, shutdown).
+        The angle is None when the servo was removed.
+        """
+        self.position_listeners.append(listener)
+    
+    def _cached_payload(self, key, builder):
+        """
+        Serialize a payload once per state version
+        Returns: (version, json_bytes)
+        """
+        with self.state_lock:
+            version = self.version
+            cached = self._payload_cache.get(key)
+        if cached is None:
+            cached = json.dumps(builder()).encode('utf-8')
+            with self.state_lock:
+                # Only keep it if nothing changed while serializing
+                if self.version == version:
+                    self._payload_cache[key] = cached
+        return version, cached
     
     def is_connected(self):
         """Check if servo controller is properly connected"""
@@ -103,6 +288,41 @@ class MultiServoController:
             }
             for servo_id, config in self.servo_configs.items()
         ]
+    
+    def get_servo_list_payload(self):
+        """Serialized servo list response, cached per state version"""
+        return self._cached_payload('servos', lambda: {
+            'success': True,
+            'version': self.version,
+            'epoch': self.epoch,
+            'servos': self.get_servo_list()
+        })
+    
+    def get_positions_payload(self):
+        """Serialized positions response, cached per state version"""
+        return self._cached_payload('positions', lambda: {
+            'success': True,
+            'version': self.version,
+            'epoch': self.epoch,
+            'positions': self.get_all_positions()
+        })
+    
+    def get_servo_changes(self, since):
+        """
+        Get servos changed after a given state version
+        Returns: dict with the current version, changed servos and removed servo ids
+        """
+        with self.state_lock:
+            version = self.version
+            changed = {servo_id for servo_id, v in self.servo_versions.items() if v > since}
+            removed = [servo_id for servo_id, v in self.removed_versions.items() if v > since]
+        return {
+            'version': version,
+            'epoch': self.epoch,
+            'servos': [servo for servo in self.get_servo_list() if servo['id'] in changed],
+            'removed': removed
+        }
+    
     def open_servo(self, servo_id):
         """Move servo to its open position (open_angle or max_angle)"""
         config = self.servo_configs.get(servo_id)
@@ -124,23 +344,24 @@ class MultiServoController:
         if not self.initialized:
             raise RuntimeError("Servo controller not initialized")
         
-        # PCA9685 has 12-bit resolution (0–4095)
-        # Convert microseconds to duty cycle value
-        duty_cycle = int(pulse_us / 20000 * 0xFFFF)
+        duty_cycle = self._pulse_to_duty_cycle(pulse_us)
         channel.duty_cycle = duty_cycle
         
         if self.mock_mode:
-            # Print mock output for debugging
-            print(f"MOCK: Setting pulse width to {pulse_us}μs (duty cycle: {duty_cycle})")
+            # Log mock output for debugging
+            logger.debug("MOCK: Setting pulse width to %sμs (duty cycle: %s)", pulse_us, duty_cycle)
 
-    def _set_servo_angle(self, servo_id, angle):
-        """Internal method to set servo angle"""
-        if servo_id not in self.servos:
-            raise ValueError(f"Servo {servo_id} not found or not enabled")
-        
-        servo = self.servos[servo_id]
-        servo_config = servo['config']
-        
+    def _pulse_to_duty_cycle(self, pulse_us):
+        """Convert a pulse width in microseconds to a 16-bit duty cycle"""
+        # PCA9685 has 12-bit resolution (0–4095)
+        # Convert microseconds to duty cycle value
+        return int(pulse_us / 20000 * 0xFFFF)
+    
+    def _angle_to_pulse(self, servo_config, angle):
+        """
+        Clamp angle to the servo range and convert it to a pulse width
+        Returns: (angle, pulse_us)
+        """
         # Validate angle range
         min_angle = servo_config['min_angle']
         max_angle = servo_config['max_angle']
@@ -150,27 +371,72 @@ class MultiServoController:
         pulse_range = servo_config['max_pulse_us'] - servo_config['min_pulse_us']
         normalized_angle = angle / 180 # TODO: support for 270 and 360 degree servos
         pulse_us = servo_config['min_pulse_us'] + normalized_angle * pulse_range
+        return angle, pulse_us
+
+    def _set_servo_angle(self, servo_id, angle):
+        """Internal method to set servo angle"""
+        if servo_id not in self.servos:
+            raise ValueError(f"Servo {servo_id} not found or not enabled")
+        
+        servo = self.servos[servo_id]
+        angle, pulse_us = self._angle_to_pulse(servo['config'], angle)
         
         # Set the servo pulse
         self._set_servo_pulse(servo['channel'], pulse_us)
         
         # Update current position
-        servo['current_position'] = angle
+        if servo['current_position'] != angle:
+            servo['current_position'] = angle
+            self._touch(servo_id)
         
         return angle
     
-    def set_angle(self, servo_id, angle):
+    def set_angle(self, servo_id, angle, source='api', received_at=None):
         """
         Set servo angle
+        source: who sent the command, recorded in the actuation log
+        received_at: time.perf_counter() when the command arrived (defaults to now)
         Returns: (success: bool, actual_angle: int)
         """
+        if received_at is None:
+            received_at = time.perf_counter()
         try:
             actual_angle = self._set_servo_angle(servo_id, angle)
-            print(f"{self.servo_configs[servo_id]['name']} moved to {actual_angle}°")
+            logger.debug("%s moved to %s°", self.servo_configs[servo_id]['name'], actual_angle)
+            self.actuation_log.record(servo_id, source, angle, actual_angle, time.perf_counter() - received_at)
             return True, actual_angle
         except Exception as e:
-            print(f"Error setting servo {servo_id} angle: {e}")
-            return False, self.get_position(servo_id)
+            logger.warning("Error setting servo %s angle: %s", servo_id, e)
+            actual_angle = self.get_position(servo_id)
+            self.actuation_log.record(
+                servo_id, source, angle, actual_angle, time.perf_counter() - received_at, success=False
+            )
+            return False, actual_angle
+    
+    def _move_internal(self, servo_id, angle, source):
+        """Move a servo for the controller's own bookkeeping (config changes, shutdown) and log it"""
+        start = time.perf_counter()
+        actual_angle = self._set_servo_angle(servo_id, angle)
+        self.actuation_log.record(servo_id, source, angle, actual_angle, time.perf_counter() - start)
+        return actual_angle
+    
+    def get_history(self, servo_id, start=None, end=None, limit=1000):
+        """Logged commands for a servo between two wall clock times, oldest first"""
+        return self.actuation_log.query(servo_id, start, end, limit)
+    
+    def submit_angle(self, servo_id, angle, wait=True, source='api', received_at=None):
+        """
+        Set servo angle through the latest-wins command mailbox
+        A newer command for the same servo replaces this one if it has not
+        been written yet.
+        received_at: time.perf_counter() when the command arrived (defaults to now)
+        Returns: dict with success, angle and coalesced (number of
+        intermediate commands dropped in favour of the written angle)
+        """
+        if servo_id not in self.servos:
+            success, actual_angle = self.set_angle(servo_id, angle, source, received_at)
+            return {'success': success, 'angle': actual_angle, 'coalesced': 0}
+        return self.mailbox.submit(servo_id, angle, wait=wait, source=source, received_at=received_at)
     
     def get_position(self, servo_id):
         """Get current servo position in degrees"""
@@ -189,36 +455,34 @@ class MultiServoController:
         """Add a new servo configuration"""
         try:
             # Validate configuration
-            required_fields = ['name', 'channel', 'min_angle', 'max_angle', 'min_pulse_us', 'max_pulse_us', 'default_angle']
-            for field in required_fields:
-                if field not in servo_config:
-                    raise ValueError(f"Missing required field: {field}")
-            
-            # Check channel availability
+            error = self._validate_servo_config(servo_config)
+            if error:
+                raise ValueError(error)
             channel = servo_config['channel']
-            if channel < 0 or channel >= 16:
-                raise ValueError("Channel must be between 0 and 15")
-            
-            # Check if channel is already in use
-            for existing_id, existing_config in self.servo_configs.items():
-                if existing_config['channel'] == channel and existing_config.get('enabled', False):
-                    if existing_id != servo_id:
-                        raise ValueError(f"Channel {channel} already in use by {existing_config['name']}")
             
-            # Add to configuration
-            self.servo_configs[servo_id] = servo_config
-            
-            # Initialize if enabled
-            if servo_config.get('enabled', False) and self.initialized:
-                channel_obj = self.pca.channels[channel]
-                self.servos[servo_id] = {
-                    'channel': channel_obj,
-                    'config': servo_config,
-                    'current_position': servo_config['default_angle']
-                }
-                self._set_servo_angle(servo_id, servo_config['default_angle'])
-            
-            self.save_servo_configs()
+            with self.config_lock:
+                # Check if channel is already in use
+                for existing_id, existing_config in self.servo_configs.items():
+                    if existing_config['channel'] == channel and existing_config.get('enabled', False):
+                        if existing_id != servo_id:
+                            raise ValueError(f"Channel {channel} already in use by {existing_config['name']}")
+                
+                # Add to configuration
+                self.servo_configs[servo_id] = servo_config
+                
+                # Initialize if enabled
+                if servo_config.get('enabled', False) and self.initialized:
+                    self._configure_simulated_servo(servo_config)
+                    channel_obj = self.pca.channels[channel]
+                    self.servos[servo_id] = {
+                        'channel': channel_obj,
+                        'config': servo_config,
+                        'current_position': servo_config['default_angle']
+                    }
+                    self._move_internal(servo_id, servo_config['default_angle'], 'config')
+                
+                self._touch(servo_id)
+                self.save_servo_configs()
             return True, "Servo added successfully"
             
         except Exception as e:
@@ -227,73 +491,324 @@ class MultiServoController:
     def remove_servo(self, servo_id):
         """Remove a servo configuration"""
         try:
-            if servo_id in self.servos:
-                # Move to safe position before removing
-                self._set_servo_angle(servo_id, config.SAFE_SHUTDOWN_ANGLE)
-                del self.servos[servo_id]
-            
-            if servo_id in self.servo_configs:
-                del self.servo_configs[servo_id]
-            
-            self.save_servo_configs()
+            with self.config_lock:
+                if servo_id in self.servos:
+                    # Move to safe position before removing
+                    self._move_internal(servo_id, config.SAFE_SHUTDOWN_ANGLE, 'config')
+                    del self.servos[servo_id]
+                
+                if servo_id in self.servo_configs:
+                    del self.servo_configs[servo_id]
+                    self._touch(servo_id, removed=True)
+                
+                self.save_servo_configs()
             return True, "Servo removed successfully"
             
         except Exception as e:
             return False, str(e)
     
     def update_servo_config(self, servo_id, new_config):
-        """Update servo configuration"""
+        """
+        Update servo configuration
+        Only the fields present in new_config change. The servo keeps its
+        position unless the change affects its output (see apply_servo_configs).
+        """
         try:
-            if servo_id not in self.servo_configs:
-                return False, "Servo not found"
-            
-            # Update configuration
-            self.servo_configs[servo_id].update(new_config)
-            
-            # Re-initialize if enabled
-            if new_config.get('enabled', False):
-                if servo_id in self.servos:
-                    del self.servos[servo_id]
+            with self.config_lock:
+                if servo_id not in self.servo_configs:
+                    return False, "Servo not found"
                 
-                channel_obj = self.pca.channels[new_config['channel']]
-                self.servos[servo_id] = {
-                    'channel': channel_obj,
-                    'config': self.servo_configs[servo_id],
-                    'current_position': new_config.get('default_angle', 90)
-                }
-                self._set_servo_angle(servo_id, new_config.get('default_angle', 90))
-            else:
-                # Disable servo
-                if servo_id in self.servos:
-                    del self.servos[servo_id]
-            
-            self.save_servo_configs()
+                servo_config = dict(self.servo_configs[servo_id], **new_config)
+                changes = self.apply_servo_configs(dict(self.servo_configs, **{servo_id: servo_config}))
+                if servo_id in changes['rejected']:
+                    return False, changes['rejected'][servo_id]
+                
+                self.save_servo_configs()
             return True, "Servo configuration updated"
             
         except Exception as e:
             return False, str(e)
+    
+    def apply_servo_configs(self, new_configs):
+        """
+        Bring the running servos in line with a new set of configurations
+        
+        Each servo's old and new config are compared field by field and only
+        the differences are applied:
+        - added / removed / enabled changed: the servo is started at its
+          default angle, or moved to SAFE_SHUTDOWN_ANGLE and released
+        - channel changed: the current position is written to the new channel
+          and the old channel is switched off
+        - pulse range changed: the current position is rewritten with the new range
+        - angle range changed: the servo only moves if it is now out of range
+        - anything else (name, default/open/close angle): config only, no write
+        
+        Every entry is validated before anything changes. Invalid entries (not
+        an object, missing fields, non-numeric angles or pulses, empty ranges,
+        channel out of range or already in use) are rejected and keep their old
+        config. All outputs are written in one block.
+        Returns: dict of added, removed, updated ({servo_id: [fields]}),
+        rejected ({servo_id: reason}, '*' when new_configs itself is not an
+        object), outputs written and duration_ms
+        """
+        start = time.perf_counter()
+        changes = {'added': [], 'removed': [], 'updated': {}, 'rejected': {}}
+        outputs = {}   # channel -> duty cycle
+        moves = []     # (servo_id, requested, actual)
+        
+        if not isinstance(new_configs, dict):
+            logger.error("Rejected servo configs: expected an object, got %s", type(new_configs).__name__)
+            changes['rejected']['*'] = "Servo configs must be an object keyed by servo id"
+            changes['outputs'] = 0
+            changes['duration_ms'] = (time.perf_counter() - start) * 1000
+            return changes
+        
+        with self.config_lock:
+            changed = {}
+            for servo_id, servo_config in new_configs.items():
+                if self.servo_configs.get(servo_id) == servo_config:
+                    continue
+                error = self._validate_servo_config(servo_config)
+                if error:
+                    changes['rejected'][servo_id] = error
+                else:
+                    changed[servo_id] = servo_config
+            self._reject_channel_conflicts(new_configs, changed, changes['rejected'])
+            for servo_id, error in changes['rejected'].items():
+                logger.error("Rejected config for servo %s: %s", servo_id, error)
+            
+            # Validation is complete, nothing has been modified before this point.
+            # Should planning still fail, the old state is restored and nothing is written.
+            saved_configs = dict(self.servo_configs)
+            saved_servos = {servo_id: dict(servo) for servo_id, servo in self.servos.items()}
+            try:
+                for servo_id in [s for s in self.servo_configs if s not in new_configs]:
+                    if servo_id in self.servos:
+                        self._plan_move(servo_id, config.SAFE_SHUTDOWN_ANGLE, outputs, moves)
+                        del self.servos[servo_id]
+                    del self.servo_configs[servo_id]
+                    changes['removed'].append(servo_id)
+                
+                for servo_id, servo_config in changed.items():
+                    old_config = self.servo_configs.get(servo_id)
+                    if old_config is None:
+                        changes['added'].append(servo_id)
+                    else:
+                        changes['updated'][servo_id] = sorted(
+                            field for field in set(old_config) | set(servo_config)
+                            if old_config.get(field) != servo_config.get(field)
+                        )
+                    self.servo_configs[servo_id] = servo_config
+                    self._reconcile_servo(servo_id, old_config or {}, servo_config, outputs, moves)
+            except Exception as e:
+                logger.error("Could not apply servo configs, keeping the old ones: %s", e)
+                self._restore_servos(saved_configs, saved_servos)
+                for servo_id in changes['removed'] + list(changed):
+                    changes['rejected'][servo_id] = str(e)
+                changes.update(added=[], removed=[], updated={}, outputs=0)
+                changes['duration_ms'] = (time.perf_counter() - start) * 1000
+                return changes
+            
+            if outputs and self.initialized:
+                self._write_channel_block(outputs)
+            latency = time.perf_counter() - start
+            for servo_id, requested, actual in moves:
+                self.actuation_log.record(servo_id, 'config', requested, actual, latency)
+            
+            for servo_id in changes['removed']:
+                self._touch(servo_id, removed=True)
+            for servo_id in changes['added'] + list(changes['updated']):
+                self._touch(servo_id)
+        
+        changes['outputs'] = len(outputs)
+        changes['duration_ms'] = (time.perf_counter() - start) * 1000
+        return changes
+    
+    def _validate_servo_config(self, servo_config):
+        """Reason a servo config is invalid on its own, or None"""
+        if not isinstance(servo_config, dict):
+            return "Servo config must be an object"
+        for field in REQUIRED_FIELDS:
+            if field not in servo_config:
+                return f"Missing required field: {field}"
+        channel = servo_config['channel']
+        if not _is_int(channel) or channel < 0 or channel >= 16:
+            return "Channel must be between 0 and 15"
+        for field in NUMBER_FIELDS + [f for f in OPTIONAL_ANGLE_FIELDS if f in servo_config]:
+            if not _is_number(servo_config[field]):
+                return f"{field} must be a number"
+        if servo_config['min_angle'] >= servo_config['max_angle']:
+            return "min_angle must be less than max_angle"
+        if not 0 < servo_config['min_pulse_us'] < servo_config['max_pulse_us']:
+            return "min_pulse_us must be positive and less than max_pulse_us"
+        for field in ['default_angle'] + [f for f in OPTIONAL_ANGLE_FIELDS if f in servo_config]:
+            if not servo_config['min_angle'] <= servo_config[field] <= servo_config['max_angle']:
+                return f"{field} must be between min_angle and max_angle"
+        return None
+    
+    def _restore_servos(self, servo_configs, servos):
+        """Put back the configs and servo state saved before a failed apply"""
+        self.servo_configs.clear()
+        self.servo_configs.update(servo_configs)
+        for servo_id in [s for s in self.servos if s not in servos]:
+            del self.servos[servo_id]
+        for servo_id, servo in servos.items():
+            # Updated in place, the command path may hold a reference
+            self.servos.setdefault(servo_id, {}).update(servo)
+            self._configure_simulated_servo(servo['config'])
+    
+    def _reject_channel_conflicts(self, new_configs, changed, rejected):
+        """
+        Move changed configs that would share a channel with another enabled
+        servo from changed to rejected
+        Servos keeping their config or their channel hold it first, then the
+        other changes claim channels in order. A rejected servo keeps its old
+        config and so its old channel, which can collide with a change accepted
+        earlier, so this repeats until no more configs are rejected.
+        """
+        while True:
+            kept = [s for s in new_configs if s not in changed and s in self.servo_configs]
+            staying = [s for s in changed if self._holds_channel(s, changed[s]['channel'])]
+            moving = [s for s in changed if s not in staying]
+            owners = {}   # channel -> servo ids in claim order
+            for servo_id in kept + staying + moving:
+                servo_config = changed[servo_id] if servo_id in changed else self.servo_configs[servo_id]
+                if servo_config.get('enabled', False):
+                    owners.setdefault(servo_config['channel'], []).append(servo_id)
+            
+            conflicts = {}
+            for channel, servo_ids in owners.items():
+                holder = servo_ids[0]
+                holder_config = changed[holder] if holder in changed else self.servo_configs[holder]
+                for servo_id in servo_ids[1:]:
+                    if servo_id in changed:
+                        conflicts[servo_id] = f"Channel {channel} already in use by {holder_config['name']}"
+            if not conflicts:
+                return
+            for servo_id, error in conflicts.items():
+                del changed[servo_id]
+                rejected[servo_id] = error
+    
+    def _holds_channel(self, servo_id, channel):
+        """True if the servo's current config drives this channel"""
+        old_config = self.servo_configs.get(servo_id)
+        return old_config is not None and old_config.get('enabled', False) and old_config['channel'] == channel
+    
+    def _reconcile_servo(self, servo_id, old_config, servo_config, outputs, moves):
+        """Plan the output changes for one servo whose config changed"""
+        servo = self.servos.get(servo_id)
+        enabled = servo_config.get('enabled', False) and self.initialized
+        
+        if servo is None:
+            if enabled:
+                self._configure_simulated_servo(servo_config)
+                self.servos[servo_id] = {
+                    'channel': self.pca.channels[servo_config['channel']],
+                    'config': servo_config,
+                    'current_position': servo_config['default_angle']
+                }
+                self._plan_move(servo_id, servo_config['default_angle'], outputs, moves)
+            return
+        
+        if not enabled:
+            # Disabled servos hold their last position, as before
+            del self.servos[servo_id]
+            return
+        
+        old_channel = old_config.get('channel')
+        servo['config'] = servo_config
+        position = servo['current_position']
+        pulse_changed = any(old_config.get(field) != servo_config[field] for field in PULSE_FIELDS)
+        if servo_config['channel'] != old_channel or pulse_changed:
+            self._configure_simulated_servo(servo_config)
+        if servo_config['channel'] != old_channel:
+            servo['channel'] = self.pca.channels[servo_config['channel']]
+            # The vacated channel stops pulsing unless another servo takes it over
+            outputs.setdefault(old_channel, 0)
+            self._plan_move(servo_id, position, outputs, moves)
+        elif pulse_changed:
+            self._plan_move(servo_id, position, outputs, moves)
+        elif not servo_config['min_angle'] <= position <= servo_config['max_angle']:
+            self._plan_move(servo_id, position, outputs, moves)
+    
+    def _plan_move(self, servo_id, angle, outputs, moves):
+        """Queue a servo's output for the next block write and update its position"""
+        servo = self.servos[servo_id]
+        actual, pulse_us = self._angle_to_pulse(servo['config'], angle)
+        outputs[servo['config']['channel']] = self._pulse_to_duty_cycle(pulse_us)
+        servo['current_position'] = actual
+        moves.append((servo_id, angle, actual))
+    
+    def reload_servo_configs(self):
+        """
+        Re-read the config file and apply what changed
+        Called by the config watcher; the controller's own saves are skipped.
+        """
+        try:
+            with open(config.SERVO_CONFIG_FILE, 'r') as f:
+                text = f.read()
+            if text == self._config_snapshot:
+                return None
+            new_configs = json.loads(text)
+        except (OSError, ValueError) as e:
+            # Usually an editor mid-save, the next event brings the complete file
+            logger.warning("Could not read %s: %s", config.SERVO_CONFIG_FILE, e)
+            return None
+        
+        with self.config_lock:
+            self._config_snapshot = text
+            changes = self.apply_servo_configs(new_configs)
+        logger.info(
+            "Reloaded %s: %d added, %d removed, %d updated, %d rejected, %d outputs written in %.1f ms",
+            config.SERVO_CONFIG_FILE, len(changes['added']), len(changes['removed']),
+            len(changes['updated']), len(changes['rejected']), changes['outputs'], changes['duration_ms']
+        )
+        return changes
 
     def load_servo_configs(self):
         """Load servo configurations from JSON file"""
         if os.path.exists(config.SERVO_CONFIG_FILE):
             with open(config.SERVO_CONFIG_FILE, 'r') as f:
-                return json.load(f)
+                self._config_snapshot = f.read()
+            return json.loads(self._config_snapshot)
         return {}
 
     def save_servo_configs(self):
         """Save servo configurations to JSON file"""
-        with open(config.SERVO_CONFIG_FILE, 'w') as f:
-            json.dump(self.servo_configs, f, indent=4)
+        text = json.dumps(self.servo_configs, indent=4)
+        with self.config_lock:
+            # Remembered so the config watcher ignores this write
+            self._config_snapshot = text
+            with open(config.SERVO_CONFIG_FILE, 'w') as f:
+                f.write(text)
+    
+    def set_angles(self, angles, source='batch'):
+        """
+        Set several servo angles in one call
+        Goes through the command mailbox like single commands, so it replaces
+        pending slider targets and keeps the per-servo MOVEMENT_DELAY.
+        angles: dict of servo_id -> angle
+        """
+        received_at = time.perf_counter()
+        running = {servo_id: angle for servo_id, angle in angles.items() if servo_id in self.servos}
+        queued = self.mailbox.submit_many(running, source=source, received_at=received_at) if running else {}
+        
+        results = {}
+        for servo_id, angle in angles.items():
+            if servo_id in queued:
+                results[servo_id] = {'success': queued[servo_id]['success'], 'angle': queued[servo_id]['angle']}
+            else:
+                success, actual_angle = self.set_angle(servo_id, angle, source, received_at)
+                results[servo_id] = {'success': success, 'angle': actual_angle}
+        return results
     
     def center_all(self):
         """Move all servos to their center positions"""
-        results = {}
+        centers = {}
         for servo_id in self.servos:
             servo_config = self.servo_configs[servo_id]
-            center_angle = (servo_config['min_angle'] + servo_config['max_angle']) // 2
-            success, angle = self.set_angle(servo_id, center_angle)
-            results[servo_id] = {'success': success, 'angle': angle}
-        return results
+            centers[servo_id] = (servo_config['min_angle'] + servo_config['max_angle']) // 2
+        return self.set_angles(centers, 'center')
     
     def sweep_servo(self, servo_id, start_angle=None, end_angle=None, step=10, delay=0.1):
         """
@@ -316,7 +831,7 @@ class MultiServoController:
                 angles = range(start_angle, end_angle - 1, -step)
             
             for angle in angles:
-                self.set_angle(servo_id, angle)
+                self.submit_angle(servo_id, angle, source='sweep')
                 time.sleep(delay)
             
             return True, "Sweep completed"
@@ -326,23 +841,29 @@ class MultiServoController:
     
     def cleanup(self):
         """Clean up resources and deinitialize hardware"""
+        self.config_watcher.stop()
+        self.mailbox.stop()
         if self.pca:
             try:
                 # Move all servos to safe positions
                 for servo_id in self.servos:
                     servo_config = self.servo_configs[servo_id]
                     safe_angle = servo_config.get('default_angle', config.SAFE_SHUTDOWN_ANGLE)
-                    self._set_servo_angle(servo_id, safe_angle)
+                    self._move_internal(servo_id, safe_angle, 'shutdown')
                 
                 time.sleep(0.5)  # Allow time for movement
                 
                 # Deinitialize PCA9685
                 self.pca.deinit()
-                print("Multi-servo controller cleaned up")
+                logger.info("Multi-servo controller cleaned up")
                 
             except Exception as e:
-                print(f"Error during cleanup: {e}")
+                logger.error("Error during cleanup: %s", e)
             finally:
+                self.actuation_log.stop()
                 self.initialized = False
                 self.pca = None
-                self.servos = {}
\ No newline at end of file
+                released = list(self.servos)
+                self.servos = {}
+                for servo_id in released:
+                    self._touch(servo_id)
\ No newline at end of file
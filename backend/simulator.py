@@ -0,0 +1,377 @@
+# Timing-accurate PCA9685 / servo simulator
+#
+# Stands in for the adafruit PCA9685 driver (same channels / duty_cycle /
+# frequency / i2c_device interface) but models what the real hardware costs:
+#   - every I2C transaction occupies a shared bus for its bit time at the
+#     configured bus speed, and callers block until it completes
+#   - the PCA9685 register map, including MODE1 auto-increment, ALL_LED and
+#     PRE_SCALE (only writable in sleep)
+#   - servos that slew towards the commanded angle at a fixed rate, with new
+#     pulses taking effect at the next PWM period
+
+import math
+import struct
+import threading
+import time
+
+# PCA9685 register map
+MODE1 = 0x00
+MODE2 = 0x01
+LED0_ON_L = 0x06
+LED_LAST = 0x45           # LED15_OFF_H
+ALL_LED_ON_L = 0xFA
+ALL_LED_OFF_H = 0xFD
+PRE_SCALE = 0xFE
+
+MODE1_AI = 0x20           # Register auto-increment
+MODE1_SLEEP = 0x10        # Oscillator off
+FULL_ON_OFF_BIT = 0x10    # Bit 4 of LEDn_ON_H / LEDn_OFF_H
+
+REFERENCE_CLOCK = 25000000
+NUM_CHANNELS = 16
+
+
+class SimulatedI2CBus:
+    """
+    Shared I2C bus with transaction timing
+
+    A transaction takes (start + address + data bytes with ACKs + stop) bit
+    times. Transactions are serialized: a caller arriving while the bus is busy
+    waits for the transactions ahead of it, which is how contention shows up.
+    With realtime=False the timing is only accounted, not slept.
+    """
+
+    def __init__(self, frequency=100000, realtime=True):
+        self.frequency = frequency
+        self.realtime = realtime
+        self.lock = threading.Lock()
+        self.device_lock = threading.Lock()   # Held by an I2CDevice for its whole `with` block
+        self.busy_until = 0.0
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats_start = time.monotonic()
+            self.busy_time = 0.0
+            self.transactions = 0
+            self.bytes = 0
+
+    def transaction_time(self, nbytes, repeated_start=False):
+        """Bit time of one transaction: START, address, data bytes (9 bits each with ACK), STOP"""
+        bits = 1 + 9 + 9 * nbytes + 1
+        if repeated_start:
+            bits += 1 + 9  # Repeated START and the address again for the read phase
+        return bits / self.frequency
+
+    def transfer(self, nbytes, repeated_start=False):
+        """Occupy the bus for one transaction, returns the time.monotonic() it completes"""
+        duration = self.transaction_time(nbytes, repeated_start)
+        with self.lock:
+            start = max(time.monotonic(), self.busy_until)
+            self.busy_until = start + duration
+            self.busy_time += duration
+            self.transactions += 1
+            self.bytes += nbytes
+            end = self.busy_until
+        if self.realtime:
+            remaining = end - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+        return end
+
+    def get_stats(self):
+        with self.lock:
+            elapsed = max(time.monotonic() - self.stats_start, 1e-9)
+            return {
+                'transactions': self.transactions,
+                'bytes': self.bytes,
+                'busy_time': self.busy_time,
+                'utilization': min(1.0, self.busy_time / elapsed),
+            }
+
+
+class SimulatedServo:
+    """Hobby servo that slews linearly towards the angle encoded by its pulse width"""
+
+    def __init__(self, slew_rate=600.0, min_pulse_us=500, max_pulse_us=2500, range_deg=180):
+        self.slew_rate = slew_rate          # Degrees per second
+        self.min_pulse_us = min_pulse_us
+        self.max_pulse_us = max_pulse_us
+        self.range_deg = range_deg
+        self.start_angle = None
+        self.target = None
+        self.move_start = 0.0
+
+    def configure(self, min_pulse_us, max_pulse_us):
+        self.min_pulse_us = min_pulse_us
+        self.max_pulse_us = max_pulse_us
+
+    def angle_for_pulse(self, pulse_us):
+        span = self.max_pulse_us - self.min_pulse_us
+        return (pulse_us - self.min_pulse_us) / span * self.range_deg
+
+    def position_at(self, t):
+        """Servo angle at time t (time.monotonic() based)"""
+        if self.target is None:
+            return None
+        if self.start_angle is None:
+            return self.target
+        delta = self.target - self.start_angle
+        travel = self.slew_rate * max(0.0, t - self.move_start)
+        if travel >= abs(delta):
+            return self.target
+        return self.start_angle + math.copysign(travel, delta)
+
+    def arrival_time(self):
+        """time.monotonic() at which the servo reaches its current target"""
+        if self.target is None or self.start_angle is None:
+            return self.move_start
+        return self.move_start + abs(self.target - self.start_angle) / self.slew_rate
+
+    def set_pulse(self, pulse_us, effective_time):
+        """
+        Apply a new pulse width from effective_time on
+        Returns: the new target angle, or None if the target did not change
+        """
+        if not pulse_us:
+            return None  # No pulses: the servo goes limp and holds where it is
+        target = self.angle_for_pulse(pulse_us)
+        if self.target is not None and abs(target - self.target) < 1e-9:
+            return None
+        self.start_angle = self.position_at(effective_time)
+        self.target = target
+        self.move_start = effective_time
+        return target
+
+
+class SimulatedI2CDevice:
+    """adafruit_bus_device.I2CDevice lookalike bound to the simulated chip"""
+
+    def __init__(self, bus, chip):
+        self.bus = bus
+        self.chip = chip
+
+    def __enter__(self):
+        # I2CDevice spins on i2c.try_lock() until it owns the bus, so the
+        # transactions of one `with` block (e.g. a block write's read and
+        # write) are never interleaved with another thread's
+        self.bus.device_lock.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.bus.device_lock.release()
+        return False
+
+    def write(self, buffer, start=0, end=None):
+        data = bytes(buffer[start:end])
+        done = self.bus.transfer(len(data))
+        self.chip.write_registers(data[0], data[1:], done)
+
+    def write_then_readinto(self, out_buffer, in_buffer, **kwargs):
+        self.bus.transfer(len(out_buffer) + len(in_buffer), repeated_start=True)
+        in_buffer[:] = self.chip.read_registers(out_buffer[0], len(in_buffer))
+
+
+class SimulatedChannel:
+    """adafruit PWMChannel lookalike, each duty_cycle write is one 5 byte transaction"""
+
+    def __init__(self, pca, index):
+        self._pca = pca
+        self._index = index
+
+    @property
+    def duty_cycle(self):
+        on, off = self._pca.led_registers(self._index)
+        if on & 0x1000:
+            return 0xFFFF
+        return (off & 0x0FFF) << 4
+
+    @duty_cycle.setter
+    def duty_cycle(self, value):
+        if not 0 <= value <= 0xFFFF:
+            raise ValueError(f"Out of range: value {value} not 0 <= value <= 65,535")
+        if value == 0xFFFF:
+            on, off = 0x1000, 0
+        else:
+            on, off = 0, (value + 1) >> 4
+        with self._pca.i2c_device as i2c:
+            i2c.write(bytes([LED0_ON_L + 4 * self._index]) + struct.pack('<HH', on, off))
+
+
+class SimulatedPCA9685:
+    """
+    PCA9685 register-level simulator with attached servo models
+
+    Drop-in for adafruit_pca9685.PCA9685 as used by MultiServoController.
+    Motion listeners are called as listener(channel, target_angle,
+    effective_time) whenever a write changes a servo's target.
+    """
+
+    def __init__(self, bus=None, address=0x40, slew_rate=600.0, reference_clock_speed=REFERENCE_CLOCK):
+        self.bus = bus or SimulatedI2CBus()
+        self.address = address
+        self.reference_clock_speed = reference_clock_speed
+        self.lock = threading.Lock()
+        self.registers = bytearray(256)
+        self.i2c_device = SimulatedI2CDevice(self.bus, self)
+        self.channels = [SimulatedChannel(self, i) for i in range(NUM_CHANNELS)]
+        self.servos = [SimulatedServo(slew_rate) for _ in range(NUM_CHANNELS)]
+        self.motion_listeners = []
+        self._power_on()
+        self.reset()
+
+    def _power_on(self):
+        """Power-on register defaults from the datasheet"""
+        self.registers[MODE1] = 0x11          # SLEEP | ALLCALL
+        self.registers[MODE2] = 0x04          # OUTDRV
+        for index in range(NUM_CHANNELS):
+            self.registers[LED0_ON_L + 4 * index + 3] = FULL_ON_OFF_BIT
+        self.registers[ALL_LED_OFF_H] = FULL_ON_OFF_BIT
+        self.registers[PRE_SCALE] = 0x1E      # ~200Hz
+
+    # adafruit_pca9685.PCA9685 interface
+
+    def reset(self):
+        with self.i2c_device as i2c:
+            i2c.write(bytes([MODE1, 0x00]))
+
+    @property
+    def frequency(self):
+        return self.reference_clock_speed / 4096 / (self.registers[PRE_SCALE] + 1)
+
+    @frequency.setter
+    def frequency(self, freq):
+        prescale = int(self.reference_clock_speed / 4096.0 / freq + 0.5) - 1
+        if prescale < 3:
+            raise ValueError("PCA9685 cannot output at the given frequency")
+        old_mode = self.registers[MODE1]
+        with self.i2c_device as i2c:
+            i2c.write(bytes([MODE1, (old_mode & 0x7F) | MODE1_SLEEP]))
+            i2c.write(bytes([PRE_SCALE, prescale]))
+            i2c.write(bytes([MODE1, old_mode]))
+            i2c.write(bytes([MODE1, old_mode | 0xA0]))  # RESTART | AI
+
+    def deinit(self):
+        self.reset()
+
+    # Register access
+
+    def led_registers(self, index):
+        """(ON, OFF) 16-bit register values of a channel"""
+        return struct.unpack_from('<HH', self.registers, LED0_ON_L + 4 * index)
+
+    def period(self):
+        """PWM period in seconds"""
+        return 1.0 / self.frequency
+
+    def pulse_us(self, index):
+        """Output pulse width of a channel in microseconds (0 when off or asleep)"""
+        if self.registers[MODE1] & MODE1_SLEEP:
+            return 0
+        on, off = self.led_registers(index)
+        if off & 0x1000:
+            return 0
+        if on & 0x1000:
+            return self.period() * 1e6
+        counts = ((off & 0x0FFF) - (on & 0x0FFF)) % 4096
+        return counts * self.period() * 1e6 / 4096
+
+    def write_registers(self, register, data, done_time):
+        """Apply a register write that completed on the bus at done_time"""
+        changed = set()
+        with self.lock:
+            for value in data:
+                if register == PRE_SCALE and not self.registers[MODE1] & MODE1_SLEEP:
+                    pass  # PRE_SCALE is only writable while the oscillator is off
+                else:
+                    self.registers[register] = value
+                if LED0_ON_L <= register <= LED_LAST:
+                    changed.add((register - LED0_ON_L) // 4)
+                elif ALL_LED_ON_L <= register <= ALL_LED_OFF_H:
+                    offset = register - ALL_LED_ON_L
+                    for index in range(NUM_CHANNELS):
+                        self.registers[LED0_ON_L + 4 * index + offset] = value
+                    changed.update(range(NUM_CHANNELS))
+                elif register == MODE1:
+                    changed.update(range(NUM_CHANNELS))
+
+                if self.registers[MODE1] & MODE1_AI:
+                    register = 0x00 if register == LED_LAST else (register + 1) & 0xFF
+            if changed:
+                self._update_outputs(changed, done_time)
+
+    def read_registers(self, register, length):
+        with self.lock:
+            data = bytearray()
+            for _ in range(length):
+                data.append(self.registers[register])
+                if self.registers[MODE1] & MODE1_AI:
+                    register = 0x00 if register == LED_LAST else (register + 1) & 0xFF
+            return data
+
+    def _update_outputs(self, channels, done_time):
+        """Outputs change on the I2C STOP; servos see the new pulse from the next period"""
+        period = self.period()
+        effective_time = (math.floor(done_time / period) + 1) * period
+        for index in sorted(channels):
+            target = self.servos[index].set_pulse(self.pulse_us(index), effective_time)
+            if target is not None:
+                for listener in self.motion_listeners:
+                    listener(index, target, effective_time)
+
+    # Observation helpers for benchmarks
+
+    def add_motion_listener(self, listener):
+        self.motion_listeners.append(listener)
+
+    def remove_motion_listener(self, listener):
+        self.motion_listeners.remove(listener)
+
+    def servo_position(self, index, t=None):
+        """Angle of the servo on a channel at time t (default: now)"""
+        return self.servos[index].position_at(time.monotonic() if t is None else t)
+
+
+class SyntheticCamera:
+    """
+    Stand-in for cv2.VideoCapture that generates a moving test pattern
+
+    read() is paced to `fps` like a real camera. Frames are a gradient with a
+    moving block, which JPEG-encodes at a size similar to a real scene rather
+    than the worst case of pure noise.
+    """
+
+    def __init__(self, width=640, height=480, fps=30):
+        import numpy as np
+        self.np = np
+        self.width = width
+        self.height = height
+        self.interval = 1.0 / fps
+        self.next_frame = time.monotonic()
+        self.count = 0
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        self.background = np.stack([
+            np.broadcast_to(x, (height, width)),
+            np.broadcast_to(y, (height, width)),
+            (x + y) / 2
+        ], axis=2).astype(np.uint8)
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        delay = self.next_frame - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame = max(self.next_frame + self.interval, time.monotonic())
+        self.count += 1
+
+        frame = self.np.roll(self.background, self.count * 4, axis=1)
+        size = self.height // 4
+        x = (self.count * 8) % (self.width - size)
+        frame[size:2 * size, x:x + size] = 255 - frame[size:2 * size, x:x + size]
+        return True, frame
+
+    def release(self):
+        pass
@@ -0,0 +1,286 @@
+# Closed-loop vision pipeline
+#
+# Webcam frames are handed to VisionPipeline.submit() by the capture thread.
+# A worker analyses the newest frame (older unanalysed frames are skipped),
+# runs every detector on its region of interest and evaluates the rules,
+# which move servos through the controller's command mailbox with source
+# 'vision'. Latency is measured from frame capture to the servo write.
+
+import collections
+import threading
+import time
+
+import numpy as np
+
+from backend.log import get_logger
+
+logger = get_logger('vision')
+
+# BGR to luma (ITU-R BT.601)
+GRAY_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    return round(float(np.percentile(np.fromiter(values, dtype=np.float64), fraction * 100)), 2)
+
+
+class Detector:
+    """Base class: crops the region of interest and downscales it by striding"""
+
+    def __init__(self, roi=(0, 0, 1, 1), max_width=160):
+        self.roi = tuple(roi)
+        self.max_width = max_width
+
+    def region(self, frame):
+        height, width = frame.shape[:2]
+        x, y, w, h = self.roi
+        x0, y0 = int(x * width), int(y * height)
+        x1, y1 = max(x0 + 1, int((x + w) * width)), max(y0 + 1, int((y + h) * height))
+        step = max(1, -(-(x1 - x0) // self.max_width))
+        return frame[y0:y1:step, x0:x1:step]
+
+    def __call__(self, frame):
+        return self.measure(self.region(frame))
+
+    def measure(self, region):
+        raise NotImplementedError
+
+
+class LevelDetector(Detector):
+    """Fill level: fraction of the region's rows that look like liquid"""
+
+    def __init__(self, threshold=100, liquid='dark', **kwargs):
+        super().__init__(**kwargs)
+        self.threshold = threshold
+        self.dark = liquid == 'dark'
+
+    def measure(self, region):
+        rows = (region.astype(np.float32) @ GRAY_WEIGHTS).mean(axis=1)
+        filled = rows < self.threshold if self.dark else rows > self.threshold
+        return float(filled.mean())
+
+
+class ColorDetector(Detector):
+    """Fraction of the region's pixels between two BGR colours"""
+
+    def __init__(self, lower=(0, 0, 0), upper=(255, 255, 255), **kwargs):
+        super().__init__(**kwargs)
+        self.lower = np.array(lower, dtype=np.uint8)
+        self.upper = np.array(upper, dtype=np.uint8)
+
+    def measure(self, region):
+        inside = ((region >= self.lower) & (region <= self.upper)).all(axis=2)
+        return float(inside.mean())
+
+
+DETECTOR_TYPES = {
+    'level': LevelDetector,
+    'color': ColorDetector,
+}
+
+
+def create_detector(spec, max_width=160):
+    """Build a detector from a VISION_DETECTORS entry"""
+    options = dict(spec)
+    detector_type = options.pop('type')
+    if detector_type not in DETECTOR_TYPES:
+        raise ValueError(f"Unknown detector type: {detector_type}")
+    return DETECTOR_TYPES[detector_type](max_width=max_width, **options)
+
+
+class Rule:
+    """Edge-triggered mapping from a detector value to a servo action"""
+
+    def __init__(self, detector, servo, action, above=None, below=None, cooldown=0.0):
+        if (above is None) == (below is None):
+            raise ValueError("Rule needs exactly one of 'above' or 'below'")
+        self.detector = detector
+        self.servo = servo
+        self.action = action
+        self.above = above
+        self.below = below
+        self.cooldown = cooldown
+        self.armed = True
+        self.last_fired = float('-inf')
+
+    def describe(self, value):
+        mark = f">= {self.above}" if self.above is not None else f"<= {self.below}"
+        return f"{self.detector} {value:.2f} {mark}"
+
+    def check(self, value, now):
+        """True when the condition has just become true and the cooldown has passed"""
+        active = value >= self.above if self.above is not None else value <= self.below
+        if not active:
+            self.armed = True
+            return False
+        if not self.armed or now - self.last_fired < self.cooldown:
+            return False
+        self.armed = False
+        self.last_fired = now
+        return True
+
+
+class VisionPipeline:
+    """
+    Runs detectors on webcam frames and applies rules to the servo controller
+
+    submit() is cheap and never blocks the capture thread: it only replaces
+    the pending frame. Frames that arrive while one is being analysed, or
+    faster than max_fps, are counted as skipped. When no frame has arrived
+    for stale_after seconds the pipeline logs an error and reports itself stale.
+    """
+
+    def __init__(self, controller, detectors, rules, max_fps=10, max_width=160, stale_after=2.0):
+        self.controller = controller
+        self.detectors = {name: create_detector(spec, max_width) for name, spec in detectors.items()}
+        self.rules = [Rule(**spec) for spec in rules]
+        for rule in self.rules:
+            if rule.detector not in self.detectors:
+                raise ValueError(f"Rule uses unknown detector: {rule.detector}")
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.stale_after = stale_after
+
+        self.cond = threading.Condition()
+        self.pending = None            # (frame, captured_at)
+        self.running = False
+        self.thread = None
+
+        self.frames = 0
+        self.processed = 0
+        self.skipped = 0
+        self.started_at = None
+        self.last_frame_at = None      # time.monotonic() of the last submitted frame
+        self.stale = False
+        self.values = {}
+        self.actuations = 0
+        self.detect_times = collections.deque(maxlen=200)
+        self.latencies = collections.deque(maxlen=200)
+        self.last_latency = None
+
+    def start(self):
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+            self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self._worker_loop, name='vision', daemon=True)
+        self.thread.start()
+        logger.info("Vision pipeline started: %d detectors, %d rules", len(self.detectors), len(self.rules))
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def submit(self, frame, captured_at=None):
+        """Hand a BGR frame to the pipeline (captured_at: time.perf_counter() of the capture)"""
+        with self.cond:
+            self.frames += 1
+            self.last_frame_at = time.monotonic()
+            if self.stale:
+                self.stale = False
+                logger.info("Webcam frames resumed")
+            if self.pending is not None:
+                self.skipped += 1
+            self.pending = (frame, time.perf_counter() if captured_at is None else captured_at)
+            self.cond.notify()
+
+    def _worker_loop(self):
+        next_run = 0.0
+        while True:
+            with self.cond:
+                if not self.cond.wait_for(lambda: self.pending is not None or not self.running, self.stale_after):
+                    self._check_stale()
+                    continue
+                if not self.running:
+                    return
+                wait_time = next_run - time.perf_counter()
+                if wait_time > 0:
+                    # Frames arriving meanwhile replace the pending one
+                    self.cond.wait_for(lambda: not self.running, wait_time)
+                    if not self.running:
+                        return
+                frame, captured_at = self.pending
+                self.pending = None
+            next_run = time.perf_counter() + self.min_interval
+            try:
+                self.process(frame, captured_at)
+            except Exception as e:
+                logger.error("Vision processing failed: %s", e)
+
+    def _frame_age(self):
+        """Seconds since the last frame (or since start if none arrived yet)"""
+        since = self.last_frame_at if self.last_frame_at is not None else self.started_at
+        return None if since is None else time.monotonic() - since
+
+    def _check_stale(self):
+        # Called with cond held when no frame arrived within stale_after
+        age = self._frame_age()
+        if not self.stale and age is not None and age >= self.stale_after:
+            self.stale = True
+            logger.error("No webcam frames for %.1f s, vision rules are not being evaluated", age)
+
+    def process(self, frame, captured_at):
+        """Run all detectors on one frame and apply the rules that fire"""
+        start = time.perf_counter()
+        values = {name: detector(frame) for name, detector in self.detectors.items()}
+        self.detect_times.append((time.perf_counter() - start) * 1000)
+        self.values = values
+        self.processed += 1
+
+        for rule in self.rules:
+            value = values[rule.detector]
+            if rule.check(value, start):
+                self._apply(rule, value, captured_at)
+        return values
+
+    def _apply(self, rule, value, captured_at):
+        servo_config = self.controller.servo_configs.get(rule.servo)
+        if servo_config is None:
+            logger.warning("Vision rule for unknown servo %s", rule.servo)
+            return
+        if rule.action == 'open':
+            angle = servo_config.get('open_angle', servo_config['max_angle'])
+        elif rule.action == 'close':
+            angle = servo_config.get('close_angle', servo_config['min_angle'])
+        else:
+            angle = rule.action
+
+        # Through the mailbox like any other command, so a pending slider target
+        # cannot overwrite it. received_at is the capture time, so the actuation
+        # log records frame-to-actuation latency.
+        result = self.controller.submit_angle(rule.servo, angle, source='vision', received_at=captured_at)
+        success, actual_angle = result['success'], result['angle']
+        latency = (time.perf_counter() - captured_at) * 1000
+        self.actuations += 1
+        self.last_latency = latency
+        self.latencies.append(latency)
+        logger.info(
+            "%s: %s %s to %s° (%s, %.1f ms after capture)",
+            rule.describe(value), rule.action, servo_config['name'], actual_angle,
+            'ok' if success else 'failed', latency
+        )
+
+    def get_stats(self):
+        """Frame counters, frame age, latest detector values and latency percentiles in ms"""
+        age = self._frame_age()
+        return {
+            'frames': self.frames,
+            'last_frame_age': None if age is None else round(age, 2),
+            'stale': self.stale or (age is not None and age >= self.stale_after),
+            'processed': self.processed,
+            'skipped': self.skipped,
+            'values': {name: round(value, 3) for name, value in self.values.items()},
+            'detect_ms': {'p50': _percentile(self.detect_times, 0.5), 'p99': _percentile(self.detect_times, 0.99)},
+            'actuations': self.actuations,
+            'latency_ms': {
+                'last': None if self.last_latency is None else round(self.last_latency, 2),
+                'p50': _percentile(self.latencies, 0.5),
+                'p99': _percentile(self.latencies, 0.99)
+            }
+        }
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Concurrent-client load generator for the control panel
+
+Starts the panel in mock mode in a separate process (with a synthetic camera,
+so /webcam works without hardware) and ramps up simulated browser sessions.
+Every session behaves like an open control panel tab (script.js): it loads
+/api/servos, polls /api/servos/positions every 5 s and /api/health every 10 s.
+A share of the sessions additionally:
+
+    slider  - drags sliders: bursts of POST /api/servos/<id>/angle
+    health  - has the /health page open (Socket.IO health_data every second)
+    webcam  - watches /webcam over Socket.IO on the 'auto' rendition
+
+For every concurrency step it reports server CPU and RSS, per-endpoint
+latency percentiles, errors, webcam frame rate and dropped frames, and marks
+the first step that breaks the latency / error budget:
+
+    python -m benchmarks.load_test --sessions 1 5 10 20 40 --duration 20
+    python -m benchmarks.load_test --url http://pi.local:5000 --pid 1234
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import backend.config as config
+from benchmarks.simulator_suite import free_port, init_panel, percentile
+
+POLL_INTERVAL = 5.0       # script.js updateAllPositions
+STATUS_INTERVAL = 10.0    # script.js updateConnectionStatus
+
+
+class LoadStats:
+    """Latencies and errors per endpoint plus webcam / health counters for one step"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.frames = 0
+        self.health_messages = 0
+
+    def record(self, endpoint, latency, ok=True):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(latency)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def count_frame(self):
+        with self.lock:
+            self.frames += 1
+
+    def count_health(self):
+        with self.lock:
+            self.health_messages += 1
+
+
+class BrowserSession:
+    """One simulated browser tab; roles add slider, health and webcam behaviour"""
+
+    def __init__(self, url, servo_ids, roles, stats, stop, rng):
+        self.url = url
+        self.servo_ids = servo_ids
+        self.roles = roles
+        self.stats = stats
+        self.stop = stop
+        self.rng = rng
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def request(self, http, method, path, endpoint, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = http.request(method, self.url + path, timeout=10, **kwargs)
+            ok = response.ok and response.json().get('success', True)
+        except Exception:
+            ok = False
+        self.stats.record(endpoint, time.perf_counter() - start, ok)
+
+    def run(self):
+        import requests
+        clients = []
+        try:
+            if 'health' in self.roles:
+                clients.append(self.open_health())
+            if 'webcam' in self.roles:
+                clients.append(self.open_webcam())
+        except Exception as e:
+            self.stats.record('socket.io connect', 0.0, ok=False)
+            logging.getLogger('load_test').debug("Socket.IO connect failed: %s", e)
+
+        with requests.Session() as http:
+            self.request(http, 'GET', '/api/servos', 'GET /api/servos')
+            # Spread the periodic polls like tabs opened at different times
+            next_poll = time.monotonic() + self.rng.uniform(0, POLL_INTERVAL)
+            next_status = time.monotonic() + self.rng.uniform(0, STATUS_INTERVAL)
+            next_burst = time.monotonic() + self.rng.uniform(1, 5)
+            while not self.stop.is_set():
+                now = time.monotonic()
+                if now >= next_poll:
+                    self.request(http, 'GET', '/api/servos/positions', 'GET /api/servos/positions')
+                    next_poll += POLL_INTERVAL
+                if now >= next_status:
+                    self.request(http, 'GET', '/api/health', 'GET /api/health')
+                    next_status += STATUS_INTERVAL
+                if 'slider' in self.roles and now >= next_burst and self.servo_ids:
+                    self.slider_burst(http)
+                    next_burst = time.monotonic() + self.rng.uniform(2, 8)
+                self.stop.wait(min(next_poll, next_status, next_burst) - time.monotonic())
+
+        for client in clients:
+            try:
+                client.disconnect()
+            except Exception:
+                pass
+
+    def slider_burst(self, http):
+        """A slider drag: 5-15 angle updates 50-150 ms apart"""
+        servo_id = self.rng.choice(self.servo_ids)
+        angle = self.rng.randint(0, 180)
+        for _ in range(self.rng.randint(5, 15)):
+            if self.stop.is_set():
+                return
+            angle = max(0, min(180, angle + self.rng.randint(-15, 15)))
+            self.request(http, 'POST', f'/api/servos/{servo_id}/angle', 'POST /api/servos/<id>/angle',
+                         json={'angle': angle})
+            time.sleep(self.rng.uniform(0.05, 0.15))
+
+    def open_health(self):
+        import socketio
+        client = socketio.Client()
+        client.on('health_data', lambda data: self.stats.count_health(), namespace='/health')
+        client.connect(self.url, namespaces=['/health'])
+        client.emit('start_monitoring', namespace='/health')
+        return client
+
+    def open_webcam(self):
+        import socketio
+        client = socketio.Client()
+
+        def on_frame(data):
+            self.stats.count_frame()
+            return True  # Acknowledge, like webcam.html
+
+        client.on('video_frame', on_frame, namespace='/webcam')
+        client.connect(self.url, namespaces=['/webcam'])
+        client.emit('update_settings', {'rendition': 'auto', 'latency': config.WEBCAM_FRAME_INTERVAL},
+                    namespace='/webcam')
+        client.emit('start_stream', namespace='/webcam')
+        return client
+
+
+class ResourceSampler:
+    """Samples CPU percent and RSS of the server process once per second"""
+
+    def __init__(self, pid):
+        self.process = None
+        if pid:
+            import psutil
+            self.process = psutil.Process(pid)
+        self.samples = []
+        self.stop = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.samples = []
+        self.stop.clear()
+        if self.process is None:
+            return
+        self.process.cpu_percent(None)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stop.wait(1.0):
+            try:
+                self.samples.append((self.process.cpu_percent(None), self.process.memory_info().rss))
+            except Exception:
+                return
+
+    def finish(self):
+        self.stop.set()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+        if not self.samples:
+            return {'cpu_avg': None, 'cpu_max': None, 'rss_mb': None}
+        cpu = [sample[0] for sample in self.samples]
+        return {
+            'cpu_avg': round(sum(cpu) / len(cpu), 1),
+            'cpu_max': round(max(cpu), 1),
+            'rss_mb': round(max(sample[1] for sample in self.samples) / 2 ** 20, 1)
+        }
+
+
+def assign_roles(count, mix, rng):
+    """Give each session its extra roles, e.g. 30% of sessions watch the webcam"""
+    roles = [set() for _ in range(count)]
+    for role, share in mix.items():
+        for index in rng.sample(range(count), round(count * share)):
+            roles[index].add(role)
+    return roles
+
+
+def webcam_dropped(url):
+    import requests
+    try:
+        viewers = requests.get(url + '/webcam/stats', timeout=5).json()['viewers']
+        return sum(viewer['dropped'] for viewer in viewers.values())
+    except Exception:
+        return None
+
+
+def run_step(url, sessions, duration, mix, servo_ids, sampler, rng):
+    stats = LoadStats()
+    stop = threading.Event()
+    roles = assign_roles(sessions, mix, rng)
+    browsers = [BrowserSession(url, servo_ids, session_roles, stats, stop, random.Random(rng.random()))
+                for session_roles in roles]
+
+    sampler.start()
+    start = time.perf_counter()
+    for browser in browsers:
+        browser.thread.start()
+    stop.wait(duration)
+    # Viewers are removed from the stats on disconnect, so read them first
+    dropped = webcam_dropped(url)
+    stop.set()
+    for browser in browsers:
+        browser.thread.join(timeout=15)
+    elapsed = time.perf_counter() - start
+    resources = sampler.finish()
+
+    viewers = sum('webcam' in session_roles for session_roles in roles)
+    health = sum('health' in session_roles for session_roles in roles)
+    requests_total = sum(len(values) for values in stats.latencies.values())
+    return {
+        'sessions': sessions,
+        **resources,
+        'requests_per_s': round(requests_total / elapsed, 1),
+        'errors': sum(stats.errors.values()),
+        'webcam_viewers': viewers,
+        'fps_per_viewer': round(stats.frames / elapsed / viewers, 1) if viewers else None,
+        'frames_dropped': dropped,
+        'health_per_s': round(stats.health_messages / elapsed / health, 2) if health else None,
+        'endpoints': {
+            endpoint: {
+                'count': len(values),
+                'errors': stats.errors.get(endpoint, 0),
+                'p50_ms': round(percentile(values, 0.5) * 1000, 1),
+                'p95_ms': round(percentile(values, 0.95) * 1000, 1),
+                'p99_ms': round(percentile(values, 0.99) * 1000, 1),
+                'max_ms': round(max(values) * 1000, 1)
+            }
+            for endpoint, values in sorted(stats.latencies.items())
+        }
+    }
+
+
+def within_budget(result, max_p99, max_errors):
+    total = sum(endpoint['count'] for endpoint in result['endpoints'].values())
+    if total and result['errors'] / total > max_errors:
+        return False
+    return all(endpoint['p99_ms'] <= max_p99 for endpoint in result['endpoints'].values())
+
+
+def fmt(value, spec):
+    if value is None:
+        # Same column width, without the precision
+        return format('-', spec.split('.')[0])
+    return format(value, spec)
+
+
+def print_step(result, ok):
+    print(f"{result['sessions']:>8} | {fmt(result['cpu_avg'], '>6.1f')}% | {fmt(result['cpu_max'], '>6.1f')}% | "
+          f"{fmt(result['rss_mb'], '>7.1f')} | {result['requests_per_s']:>6.1f} | {result['errors']:>6} | "
+          f"{fmt(result['fps_per_viewer'], '>7.1f')} | {fmt(result['frames_dropped'], '>7')} | "
+          f"{fmt(result['health_per_s'], '>6.2f')} | {'ok' if ok else 'OVER'}")
+    for endpoint, summary in result['endpoints'].items():
+        print(f"{'':>8}   {endpoint:<30} n={summary['count']:<6} p50 {summary['p50_ms']:>7.1f}  "
+              f"p95 {summary['p95_ms']:>7.1f}  p99 {summary['p99_ms']:>7.1f}  max {summary['max_ms']:>7.1f} ms")
+
+
+def serve(port):
+    """Run the panel in mock mode with a synthetic camera (server process)"""
+    config.WEBCAM_SOURCE = 'synthetic'
+    panel = init_panel()
+    # terminate() from the load generator still runs cleanup
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    try:
+        panel.socketio.run(panel.app, host='127.0.0.1', port=port, debug=False, use_reloader=False,
+                           log_output=False, allow_unsafe_werkzeug=True)
+    finally:
+        panel.cleanup()
+
+
+def start_server_process(port):
+    import requests
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.load_test', '--serve', str(port)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/api/health", timeout=1)
+            return process
+        except requests.RequestException:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Server did not start")
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        role, share = item.split('=')
+        if role not in ('slider', 'health', 'webcam'):
+            raise argparse.ArgumentTypeError(f"Unknown role: {role}")
+        mix[role] = float(share)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ramp up simulated browser sessions against the control panel")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 5, 10, 20], help="Concurrency steps")
+    parser.add_argument('--duration', type=float, default=20.0, help="Seconds per step")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('slider=0.5,health=0.2,webcam=0.3'),
+                        help="Share of sessions with each extra role (default: slider=0.5,health=0.2,webcam=0.3)")
+    parser.add_argument('--url', help="Test a running server instead of starting one in mock mode")
+    parser.add_argument('--pid', type=int, help="Server process to sample CPU/RSS from when using --url")
+    parser.add_argument('--max-p99', type=float, default=500.0, help="Latency budget per endpoint in ms")
+    parser.add_argument('--max-errors', type=float, default=0.01, help="Error rate budget")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="Also write the results to this file")
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    import requests
+    process = None
+    if args.url:
+        url, pid = args.url.rstrip('/'), args.pid
+    else:
+        port = free_port()
+        process = start_server_process(port)
+        url, pid = f"http://127.0.0.1:{port}", process.pid
+
+    try:
+        servos = requests.get(url + '/api/servos', timeout=5).json()['servos']
+        servo_ids = [servo['id'] for servo in servos if servo['enabled']]
+        sampler = ResourceSampler(pid)
+        rng = random.Random(args.seed)
+
+        mix = ', '.join(f"{role} {share:.0%}" for role, share in args.mix.items())
+        print(f"Load test against {url}: {args.duration:.0f}s per step, mix: {mix}")
+        print(f"Budget: p99 <= {args.max_p99:.0f} ms per endpoint, errors <= {args.max_errors:.0%}")
+        print("-" * 100)
+        print(f"{'sessions':>8} | {'cpu avg':>7} | {'cpu max':>7} | {'rss MB':>7} | {'req/s':>6} | {'errors':>6} | "
+              f"{'cam fps':>7} | {'dropped':>7} | {'hlth/s':>6} | budget")
+        print("-" * 100)
+
+        results = []
+        limit = None
+        for sessions in args.sessions:
+            result = run_step(url, sessions, args.duration, args.mix, servo_ids, sampler, rng)
+            ok = within_budget(result, args.max_p99, args.max_errors)
+            result['within_budget'] = ok
+            results.append(result)
+            print_step(result, ok)
+            if not ok and limit is None:
+                limit = sessions
+        print("-" * 100)
+
+        if limit is None:
+            print(f"✅ Within budget up to {args.sessions[-1]} sessions")
+        else:
+            print(f"⚠️  Budget exceeded at {limit} sessions")
+
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'url': url, 'mix': args.mix, 'duration': args.duration, 'results': results}, f, indent=2)
+    finally:
+        if process:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == '__main__':
+    main()
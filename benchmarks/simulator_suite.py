@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark suite on the simulated PCA9685
+
+Starts the control panel in-process with SIMULATE_HARDWARE enabled (no Pi
+needed, the servo configuration file is only read), then drives servo
+commands through several paths:
+
+    direct   - MultiServoController.set_angle
+    mailbox  - MultiServoController.submit_angle (latest-wins mailbox)
+    rest     - POST /api/servos/<id>/angle over a pooled connection
+    batch    - POST /api/servos/angles, all servos per request
+    socketio - set_angle events on the /servos namespace
+
+For each it reports commands/s, p50/p99 command-to-motion latency (from
+sending the command until the simulated servo starts moving towards it)
+and I2C bus utilization.
+
+    python -m benchmarks.simulator_suite -n 300 --i2c 400000
+"""
+
+import argparse
+import logging
+import socket
+import threading
+import time
+
+import backend.config as config
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class MotionTracker:
+    """Matches commands to the moment the simulated servo starts moving towards them"""
+
+    def __init__(self, channels):
+        self.channels = channels      # servo_id -> channel
+        self.lock = threading.Lock()
+        self.sent = {}                # (channel, angle) -> send time
+        self.latencies = []
+
+    def command_sent(self, servo_id, angle):
+        with self.lock:
+            self.sent[(self.channels[servo_id], round(angle))] = time.monotonic()
+
+    def on_motion(self, channel, target, effective_time):
+        with self.lock:
+            sent_at = self.sent.pop((channel, round(target)), None)
+            if sent_at is not None:
+                self.latencies.append(effective_time - sent_at)
+
+
+def command_sequence(servos, count):
+    """Round-robin over servos, alternating each servo between its range limits"""
+    for i in range(count):
+        servo = servos[i % len(servos)]
+        limit = (i // len(servos)) % 2
+        yield servo['id'], servo['max_angle'] if limit else servo['min_angle']
+
+
+def run_direct(controller, servos, count, tracker, url):
+    for servo_id, angle in command_sequence(servos, count):
+        tracker.command_sent(servo_id, angle)
+        controller.set_angle(servo_id, angle)
+    return count
+
+
+def run_mailbox(controller, servos, count, tracker, url):
+    for servo_id, angle in command_sequence(servos, count):
+        tracker.command_sent(servo_id, angle)
+        controller.submit_angle(servo_id, angle)
+    return count
+
+
+def run_rest(controller, servos, count, tracker, url):
+    from client import ServoClient
+    with ServoClient(url) as client:
+        for servo_id, angle in command_sequence(servos, count):
+            tracker.command_sent(servo_id, angle)
+            client.set_angle(servo_id, angle)
+    return count
+
+
+def run_batch(controller, servos, count, tracker, url):
+    from client import ServoClient
+    commands = list(command_sequence(servos, count))
+    with ServoClient(url) as client:
+        for i in range(0, len(commands), len(servos)):
+            batch = dict(commands[i:i + len(servos)])
+            for servo_id, angle in batch.items():
+                tracker.command_sent(servo_id, angle)
+            client.set_angles(batch)
+    return len(commands)
+
+
+def run_socketio(controller, servos, count, tracker, url):
+    from client import ServoSocketClient
+    with ServoSocketClient(url) as client:
+        for servo_id, angle in command_sequence(servos, count):
+            tracker.command_sent(servo_id, angle)
+            client.set_angle(servo_id, angle)
+    return count
+
+
+SCENARIOS = {
+    'direct': run_direct,
+    'mailbox': run_mailbox,
+    'rest': run_rest,
+    'batch': run_batch,
+    'socketio': run_socketio,
+}
+
+
+def init_panel():
+    """
+    Import the panel and initialize its controller for a benchmark run
+    Mock mode, so real hardware is never driven. The actuation log and the
+    config watcher stay off: synthetic commands must not end up in the
+    actuation_log/ audit trail, and edits to servo_configs.json must not
+    change the servos mid-run.
+    Returns: the frontend module
+    """
+    config.ACTUATION_LOG_ENABLED = False
+    config.CONFIG_WATCH_ENABLED = False
+    import frontend
+
+    frontend.servo_controller.mock_mode = True
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    frontend.servo_controller.initialize()
+    return frontend
+
+
+def start_server(port):
+    """Start the panel on a background thread with the simulated PCA9685"""
+    panel = init_panel()
+    app, socketio, servo_controller = panel.app, panel.socketio, panel.servo_controller
+
+    thread = threading.Thread(
+        target=socketio.run, args=(app,),
+        kwargs={'host': '127.0.0.1', 'port': port, 'debug': False,
+                'use_reloader': False, 'log_output': False, 'allow_unsafe_werkzeug': True},
+        daemon=True
+    )
+    thread.start()
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return servo_controller
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark command paths against the simulated PCA9685")
+    parser.add_argument('-n', '--count', type=int, default=300, help="Commands per scenario")
+    parser.add_argument('--i2c', type=int, default=config.SIMULATED_I2C_FREQUENCY, help="I2C bus speed in Hz")
+    parser.add_argument('--slew', type=float, default=config.SIMULATED_SLEW_RATE, help="Servo slew rate in °/s")
+    parser.add_argument('--only', choices=list(SCENARIOS), nargs='+', help="Run only these scenarios")
+    args = parser.parse_args()
+
+    config.SIMULATE_HARDWARE = True
+    config.SIMULATED_I2C_FREQUENCY = args.i2c
+    config.SIMULATED_SLEW_RATE = args.slew
+
+    port = free_port()
+    controller = start_server(port)
+    url = f"http://127.0.0.1:{port}"
+    pca = controller.pca
+
+    servos = [servo for servo in controller.get_servo_list() if servo['id'] in controller.servos]
+    if not servos:
+        print("❌ No enabled servos configured")
+        return
+    channels = {servo['id']: servo['channel'] for servo in servos}
+
+    print(f"Simulated PCA9685: I2C {args.i2c / 1000:.0f}kHz, slew {args.slew:.0f}°/s, "
+          f"{len(servos)} servos, {args.count} commands per scenario")
+    print("-" * 78)
+    print(f"{'scenario':<10} | {'cmd/s':>8} | {'p50 ms':>8} | {'p99 ms':>8} | {'moves':>6} | {'bus util':>8} | {'i2c txn':>7}")
+    print("-" * 78)
+
+    try:
+        for name in args.only or SCENARIOS:
+            tracker = MotionTracker(channels)
+            pca.add_motion_listener(tracker.on_motion)
+            pca.bus.reset_stats()
+            try:
+                start = time.perf_counter()
+                commands = SCENARIOS[name](controller, servos, args.count, tracker, url)
+                elapsed = time.perf_counter() - start
+                # Let the last pulses take effect before reading the tracker
+                time.sleep(2 * pca.period())
+                bus = pca.bus.get_stats()
+                latencies = [l * 1000 for l in tracker.latencies]
+                print(f"{name:<10} | {commands / elapsed:>8.1f} | {percentile(latencies, 0.5):>8.2f} | "
+                      f"{percentile(latencies, 0.99):>8.2f} | {len(latencies):>6} | "
+                      f"{bus['utilization'] * 100:>7.1f}% | {bus['transactions']:>7}")
+            except Exception as e:
+                print(f"{name:<10} | skipped: {e}")
+            finally:
+                pca.remove_motion_listener(tracker.on_motion)
+    finally:
+        controller.cleanup()
+    print("-" * 78)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+"""
+Python client for the Multi-Servo Controller web API
+
+    from client import ServoClient
+
+    with ServoClient('http://raspberrypi:5000') as panel:
+        panel.set_angle('servo_0', 120)
+        panel.set_angles({'servo_0': 90, 'servo_1756895997294': 0})
+"""
+
+from .servo_client import ServoClient, ServoClientError
+from .async_client import AsyncServoClient
+from .socket_client import ServoSocketClient
+
+__all__ = ['ServoClient', 'ServoClientError', 'AsyncServoClient', 'ServoSocketClient']
@@ -0,0 +1,114 @@
+import asyncio
+
+from .servo_client import DEFAULT_URL, ServoClientError
+
+
+class AsyncServoClient:
+    """
+    asyncio client for the /api/servos endpoints
+
+    Requires aiohttp (pip install aiohttp). One ClientSession is kept for the
+    lifetime of the client so connections are pooled and kept alive.
+
+    Usage:
+        async with AsyncServoClient('http://raspberrypi:5000') as client:
+            await client.set_angle('servo_0', 120)
+    """
+
+    def __init__(self, base_url=DEFAULT_URL, timeout=5.0, pool_size=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """Create the pooled HTTP session"""
+        try:
+            import aiohttp
+        except ImportError:
+            raise RuntimeError("AsyncServoClient requires aiohttp: pip install aiohttp")
+
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+    async def close(self):
+        """Close all pooled connections"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _request(self, method, path, payload=None):
+        if self.session is None:
+            await self.open()
+        async with self.session.request(method, f"{self.base_url}/api{path}", json=payload) as response:
+            response.raise_for_status()
+            data = await response.json()
+        if not data.get('success', False) and 'results' not in data:
+            raise ServoClientError(data.get('error') or data.get('message') or 'Request failed')
+        return data
+
+    async def list_servos(self):
+        """Get all configured servos"""
+        return (await self._request('GET', '/servos'))['servos']
+
+    async def get_position(self, servo_id):
+        """Get current position of one servo in degrees"""
+        return (await self._request('GET', f'/servos/{servo_id}/position'))['angle']
+
+    async def get_positions(self):
+        """Get positions of all active servos"""
+        return (await self._request('GET', '/servos/positions'))['positions']
+
+    async def set_angle(self, servo_id, angle):
+        """Move one servo, returns the angle actually applied"""
+        return (await self._request('POST', f'/servos/{servo_id}/angle', {'angle': angle}))['angle']
+
+    async def set_angles(self, angles):
+        """
+        Move several servos in a single request
+        angles: dict of servo_id -> angle
+        Returns: dict of servo_id -> {'success': bool, 'angle': int}
+        """
+        return (await self._request('POST', '/servos/angles', {'angles': angles}))['results']
+
+    async def set_angles_concurrently(self, angles):
+        """Move several servos with one request per servo, issued concurrently over the pool"""
+        servo_ids = list(angles)
+        results = await asyncio.gather(
+            *(self.set_angle(servo_id, angles[servo_id]) for servo_id in servo_ids),
+            return_exceptions=True
+        )
+        return {
+            servo_id: {'success': not isinstance(result, Exception), 'angle': None if isinstance(result, Exception) else result}
+            for servo_id, result in zip(servo_ids, results)
+        }
+
+    async def center_all(self):
+        """Move all servos to the middle of their range"""
+        return (await self._request('POST', '/servos/center_all'))['results']
+
+    async def add_servo(self, servo_id, servo_config):
+        """Add a new servo configuration"""
+        return (await self._request('POST', '/servos', {'servo_id': servo_id, 'config': servo_config}))['message']
+
+    async def update_servo(self, servo_id, servo_config):
+        """Update an existing servo configuration"""
+        return (await self._request('PUT', f'/servos/{servo_id}', servo_config))['message']
+
+    async def remove_servo(self, servo_id):
+        """Remove a servo configuration"""
+        return (await self._request('DELETE', f'/servos/{servo_id}'))['message']
+
+    async def health(self):
+        """Get controller health information"""
+        return await self._request('GET', '/health')
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Commands/sec benchmark for the Python client
+
+Start the server in mock mode first (python run_server.py on a machine without
+the hardware libraries), then run:
+
+    python -m client.benchmark --url http://localhost:5000 -n 500
+"""
+
+import argparse
+import asyncio
+import time
+
+import requests
+
+from .servo_client import ServoClient
+from .async_client import AsyncServoClient
+from .socket_client import ServoSocketClient
+
+
+def angle_for(i, servo):
+    """Alternate between the ends of the servo range"""
+    return servo['min_angle'] if i % 2 else servo['max_angle']
+
+
+def bench_per_call_connection(url, servos, count):
+    """Baseline: requests.post opens a new connection for every command"""
+    servo = servos[0]
+    for i in range(count):
+        requests.post(f"{url}/api/servos/{servo['id']}/angle", json={'angle': angle_for(i, servo)}, timeout=5)
+    return count
+
+
+def bench_pooled(url, servos, count):
+    servo = servos[0]
+    with ServoClient(url) as client:
+        for i in range(count):
+            client.set_angle(servo['id'], angle_for(i, servo))
+    return count
+
+
+def bench_batch(url, servos, count):
+    rounds = max(1, count // len(servos))
+    with ServoClient(url) as client:
+        for i in range(rounds):
+            client.set_angles({servo['id']: angle_for(i, servo) for servo in servos})
+    return rounds * len(servos)
+
+
+def bench_socketio(url, servos, count):
+    servo = servos[0]
+    with ServoSocketClient(url) as client:
+        for i in range(count):
+            client.set_angle(servo['id'], angle_for(i, servo))
+    return count
+
+
+def bench_async(url, servos, count, concurrency=8):
+    async def run():
+        async with AsyncServoClient(url, pool_size=concurrency) as client:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one(i):
+                servo = servos[i % len(servos)]
+                async with semaphore:
+                    await client.set_angle(servo['id'], angle_for(i, servo))
+
+            await asyncio.gather(*(one(i) for i in range(count)))
+        return count
+    return asyncio.run(run())
+
+
+BENCHMARKS = {
+    'per-call': bench_per_call_connection,
+    'pooled': bench_pooled,
+    'batch': bench_batch,
+    'socketio': bench_socketio,
+    'async': bench_async,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark servo commands/sec against a running control panel")
+    parser.add_argument('--url', default='http://localhost:5000', help="Control panel base URL")
+    parser.add_argument('-n', '--count', type=int, default=500, help="Commands per benchmark")
+    parser.add_argument('--only', choices=list(BENCHMARKS), nargs='+', help="Run only these benchmarks")
+    args = parser.parse_args()
+
+    url = args.url.rstrip('/')
+    with ServoClient(url) as client:
+        servos = [servo for servo in client.list_servos() if servo['enabled']]
+    if not servos:
+        print("❌ No enabled servos configured on the server")
+        return
+
+    print(f"Benchmarking {url} with {len(servos)} servos, {args.count} commands each")
+    print("-" * 50)
+    for name in args.only or BENCHMARKS:
+        try:
+            start = time.perf_counter()
+            commands = BENCHMARKS[name](url, servos, args.count)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<10} | {commands / elapsed:>9.1f} commands/s | {elapsed * 1000 / commands:>7.2f} ms/command")
+        except Exception as e:
+            print(f"{name:<10} | skipped: {e}")
+    print("-" * 50)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_URL = 'http://localhost:5000'
+
+
+class ServoClientError(Exception):
+    """Raised when the control panel reports a failed request"""
+
+
+class ServoClient:
+    """
+    Synchronous client for the /api/servos endpoints
+
+    All calls share one requests.Session, so connections to the panel are
+    kept alive and reused from a pool instead of being opened per command.
+    """
+
+    def __init__(self, base_url=DEFAULT_URL, timeout=5.0, pool_size=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+    def _request(self, method, path, payload=None):
+        response = self.session.request(
+            method, f"{self.base_url}/api{path}", json=payload, timeout=self.timeout
+        )
+        response.raise_for_status()
+        data = response.json()
+        # Batch endpoints report per-servo failures in 'results' instead
+        if not data.get('success', False) and 'results' not in data:
+            raise ServoClientError(data.get('error') or data.get('message') or 'Request failed')
+        return data
+
+    # Servo listing and positions
+
+    def list_servos(self):
+        """Get all configured servos"""
+        return self._request('GET', '/servos')['servos']
+
+    def get_changes(self, since, epoch):
+        """
+        Get servos changed after a state version (delta mode)
+        since and epoch come from the previous result. If 'delta' is missing
+        from the result the server restarted and 'servos' holds the full list.
+        """
+        params = {'since': since, 'epoch': epoch}
+        response = self.session.get(f"{self.base_url}/api/servos", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def get_position(self, servo_id):
+        """Get current position of one servo in degrees"""
+        return self._request('GET', f'/servos/{servo_id}/position')['angle']
+
+    def get_positions(self):
+        """Get positions of all active servos"""
+        return self._request('GET', '/servos/positions')['positions']
+
+    # Movement
+
+    def set_angle(self, servo_id, angle):
+        """Move one servo, returns the angle actually applied"""
+        return self._request('POST', f'/servos/{servo_id}/angle', {'angle': angle})['angle']
+
+    def set_angles(self, angles):
+        """
+        Move several servos in a single request
+        angles: dict of servo_id -> angle
+        Returns: dict of servo_id -> {'success': bool, 'angle': int}
+        """
+        return self._request('POST', '/servos/angles', {'angles': angles})['results']
+
+    def sweep(self, servo_id, start_angle=None, end_angle=None, step=10, delay=0.1):
+        """Run a sweep on one servo (blocks until the sweep completes)"""
+        payload = {'start_angle': start_angle, 'end_angle': end_angle, 'step': step, 'delay': delay}
+        return self._request('POST', f'/servos/{servo_id}/sweep', payload)['message']
+
+    def center_all(self):
+        """Move all servos to the middle of their range"""
+        return self._request('POST', '/servos/center_all')['results']
+
+    # Configuration
+
+    def add_servo(self, servo_id, servo_config):
+        """Add a new servo configuration"""
+        return self._request('POST', '/servos', {'servo_id': servo_id, 'config': servo_config})['message']
+
+    def update_servo(self, servo_id, servo_config):
+        """Update an existing servo configuration"""
+        return self._request('PUT', f'/servos/{servo_id}', servo_config)['message']
+
+    def remove_servo(self, servo_id):
+        """Remove a servo configuration"""
+        return self._request('DELETE', f'/servos/{servo_id}')['message']
+
+    def health(self):
+        """Get controller health information"""
+        return self._request('GET', '/health')
+
+    def get_config(self):
+        """Get global controller configuration"""
+        return self._request('GET', '/config')['config']
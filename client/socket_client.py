@@ -0,0 +1,80 @@
+from .servo_client import DEFAULT_URL, ServoClientError
+
+NAMESPACE = '/servos'
+
+
+class ServoSocketClient:
+    """
+    Socket.IO transport for streaming servo commands and position updates
+
+    Requires python-socketio with a websocket client (pip install "python-socketio[client]").
+    Commands travel over one persistent connection and are acknowledged by
+    the server; position changes from any source (other clients, sweeps,
+    center all, vision rules, config reloads, shutdown) are pushed to
+    on_positions callbacks as {servo_id: angle} dicts, with None for a
+    removed servo.
+    """
+
+    def __init__(self, base_url=DEFAULT_URL, timeout=5.0):
+        try:
+            import socketio
+        except ImportError:
+            raise RuntimeError("ServoSocketClient requires python-socketio: pip install \"python-socketio[client]\"")
+
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.positions = {}
+        self._callbacks = []
+        self.sio = socketio.Client(reconnection=True)
+        self.sio.on('positions', self._handle_positions, namespace=NAMESPACE)
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.disconnect()
+
+    def connect(self):
+        """Open the Socket.IO connection (websocket only, no long-polling)"""
+        if not self.sio.connected:
+            self.sio.connect(self.base_url, namespaces=[NAMESPACE], transports=['websocket'])
+
+    def disconnect(self):
+        self.sio.disconnect()
+
+    def on_positions(self, callback):
+        """Register callback(positions) for pushed position updates"""
+        self._callbacks.append(callback)
+        return callback
+
+    def _handle_positions(self, positions):
+        self.positions.update(positions)
+        for callback in self._callbacks:
+            callback(positions)
+
+    def _call(self, event, payload=None):
+        data = self.sio.call(event, payload, namespace=NAMESPACE, timeout=self.timeout)
+        if not data.get('success', False) and 'results' not in data:
+            raise ServoClientError(data.get('error', 'Request failed'))
+        return data
+
+    def set_angle(self, servo_id, angle):
+        """Move one servo and wait for the acknowledgement"""
+        return self._call('set_angle', {'servo_id': servo_id, 'angle': angle})['angle']
+
+    def set_angle_nowait(self, servo_id, angle):
+        """Fire-and-forget move, useful for streaming slider-like updates"""
+        self.sio.emit('set_angle', {'servo_id': servo_id, 'angle': angle}, namespace=NAMESPACE)
+
+    def set_angles(self, angles):
+        """Move several servos in one message, returns per-servo results"""
+        return self._call('set_angles', {'angles': angles})['results']
+
+    def get_positions(self):
+        """Get positions of all active servos"""
+        return self._call('get_positions')['positions']
+
+    def wait(self):
+        """Block until the connection is closed"""
+        self.sio.wait()
@@ -1,6 +1,12 @@
 from flask import Flask
 from flask_socketio import SocketIO
 import backend.config as config
+from backend.log import get_logger, setup_logging
+
+# Start the background log writer before anything logs
+setup_logging()
+logger = get_logger('server')
+
 from backend.servo_controller import MultiServoController
 
 # Initialize Flask app
@@ -21,22 +27,64 @@ app.register_blueprint(routes_bp)
 app.register_blueprint(api_bp)
 
 # Initialize controllers in route modules
-from .routes.api import servos, health
+from .routes.api import servos, health, vision
 from .routes import webcam
 
 servos.init_servo_controller(servo_controller)
+servos.init_socketio(socketio)
 health.init_servo_controller(servo_controller)
 webcam.init_socketio_and_controller(socketio, servo_controller)
 
+vision_pipeline = None
+
+def is_serving_process():
+    """
+    False in the Werkzeug reloader's parent process
+    With DEBUG the reloader runs main() in a parent that only restarts the
+    server; requests are handled by a child process.
+    """
+    from werkzeug.serving import is_running_from_reloader
+    return not config.DEBUG or is_running_from_reloader()
+
+def start_config_watcher():
+    """Hot-reload servo_configs.json, in the serving process only"""
+    if is_serving_process():
+        servo_controller.start_config_watcher()
+
+def start_vision():
+    """
+    Start the closed-loop vision pipeline on webcam frames if VISION_ENABLED
+    Only in the serving process: the reloader's parent would hold the camera
+    and drive servos from a controller that never receives commands.
+    """
+    global vision_pipeline
+    if not config.VISION_ENABLED or vision_pipeline is not None or not is_serving_process():
+        return
+    # numpy is only needed (and imported) when the pipeline is enabled
+    from backend.vision import VisionPipeline
+    vision_pipeline = VisionPipeline(
+        servo_controller, config.VISION_DETECTORS, config.VISION_RULES,
+        max_fps=config.VISION_MAX_FPS, max_width=config.VISION_PROCESS_WIDTH,
+        stale_after=config.VISION_STALE_AFTER
+    )
+    vision_pipeline.start()
+    webcam.streamer.add_frame_listener(vision_pipeline.submit)
+    vision.init_vision_pipeline(vision_pipeline)
+
 def cleanup():
     """Clean up resources"""
+    if vision_pipeline is not None:
+        webcam.streamer.remove_frame_listener(vision_pipeline.submit)
+        vision_pipeline.stop()
     servo_controller.cleanup()
-    print("Server shutdown complete")
+    logger.info("Server shutdown complete")
 
 if __name__ == '__main__':
     try:
         print("Initializing multi-servo controller...")
         servo_controller.initialize()
+        start_config_watcher()
+        start_vision()
         print(f"Starting web server on {config.HOST}:{config.PORT}")
         print(f"Open your browser and go to: http://{config.HOST}:{config.PORT}")
         socketio.run(app, host=config.HOST, port=config.PORT, debug=config.DEBUG)
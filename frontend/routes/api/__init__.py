@@ -4,4 +4,4 @@ from flask import Blueprint
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 # Import API route modules
-from . import servos, config, health
\ No newline at end of file
+from . import servos, config, health, vision
\ No newline at end of file
@@ -16,7 +16,8 @@ def health_check():
             'status': 'healthy',
             'servo_connected': servo_controller.is_connected(),
             'active_servos': len(servo_controller.servos),
-            'total_configured': len(servo_controller.servo_configs)
+            'total_configured': len(servo_controller.servo_configs),
+            'commands': servo_controller.mailbox.get_stats()
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
\ No newline at end of file
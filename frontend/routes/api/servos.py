@@ -1,19 +1,89 @@
-from flask import jsonify, request
+import time
+from flask import Response, jsonify, request
 from . import api_bp
 import backend.config as config
 
 # This will be set by the main app
 servo_controller = None
+socketio = None
 
 def init_servo_controller(controller):
     global servo_controller
     servo_controller = controller
 
+def init_socketio(sio):
+    global socketio
+    socketio = sio
+
+    # Register WebSocket event handlers after socketio is initialized
+    register_socket_events()
+
+    # Every position change, whatever its source, is pushed to /servos subscribers
+    servo_controller.add_position_listener(broadcast_positions)
+
+def broadcast_positions(positions):
+    """Push position updates to clients subscribed to the /servos namespace"""
+    if socketio is not None and positions:
+        socketio.emit('positions', positions, namespace='/servos')
+
+def register_socket_events():
+    @socketio.on('set_angle', namespace='/servos')
+    def handle_set_angle(data=None):
+        data = data or {}
+        if not isinstance(data, dict) or data.get('servo_id') is None or data.get('angle') is None:
+            return {'success': False, 'error': 'Expected {servo_id, angle}'}
+        result = servo_controller.submit_angle(data['servo_id'], data['angle'], source='socketio')
+        return {'servo_id': data['servo_id'], **result}
+
+    @socketio.on('set_angles', namespace='/servos')
+    def handle_set_angles(data=None):
+        data = data or {}
+        angles = data.get('angles') if isinstance(data, dict) else None
+        if not angles or not isinstance(angles, dict):
+            return {'success': False, 'error': 'No angles provided'}
+        results = servo_controller.set_angles(angles)
+        return {'success': all(r['success'] for r in results.values()), 'results': results}
+
+    @socketio.on('get_positions', namespace='/servos')
+    def handle_get_positions():
+        return {'success': True, 'positions': servo_controller.get_all_positions()}
+
+def versioned_response(payload, version):
+    """JSON response tagged with the controller state version, 304 if the client is up to date"""
+    etag = f"{servo_controller.epoch}-{version}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(payload, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def parse_since(since, epoch=None):
+    """State version to send changes after, or None unless it belongs to this process's epoch"""
+    if since is None:
+        return None
+    if '-' in since:
+        epoch, since = since.rsplit('-', 1)
+    if epoch != servo_controller.epoch:
+        return None
+    try:
+        return int(since)
+    except ValueError:
+        return None
+
 @api_bp.route('/servos', methods=['GET'])
 def get_servos():
     try:
-        servos = servo_controller.get_servo_list()
-        return jsonify({'success': True, 'servos': servos})
+        # Delta mode: ?since=<epoch>-<version> (the ETag) or ?since=<version>&epoch=<epoch>
+        # returns only what changed. Versions restart with the process, so without
+        # the current epoch the client gets the full list.
+        since = parse_since(request.args.get('since'), request.args.get('epoch'))
+        if since is not None and since <= servo_controller.version:
+            changes = servo_controller.get_servo_changes(since)
+            return jsonify({'success': True, 'delta': True, **changes})
+        version, payload = servo_controller.get_servo_list_payload()
+        return versioned_response(payload, version)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -24,11 +94,45 @@ def set_servo_angle(servo_id):
         angle = data.get('angle')
         if angle is None:
             return jsonify({'success': False, 'error': 'No angle provided'})
-        success, result_angle = servo_controller.set_angle(servo_id, angle)
-        if success:
-            return jsonify({'success': True, 'servo_id': servo_id, 'angle': result_angle})
+        result = servo_controller.submit_angle(servo_id, angle)
+        if result['success']:
+            return jsonify({
+                'success': True,
+                'servo_id': servo_id,
+                'angle': result['angle'],
+                'coalesced': result['coalesced']
+            })
         else:
-            return jsonify({'success': False, 'error': 'Failed to set angle'})
+            return jsonify({'success': False, 'error': result.get('error', 'Failed to set angle')})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@api_bp.route('/servos/angles', methods=['POST'])
+def set_servo_angles():
+    try:
+        data = request.get_json()
+        angles = data.get('angles')
+        if not angles:
+            return jsonify({'success': False, 'error': 'No angles provided'})
+        results = servo_controller.set_angles(angles)
+        return jsonify({'success': all(r['success'] for r in results.values()), 'results': results})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@api_bp.route('/servos/<servo_id>/history', methods=['GET'])
+def get_servo_history(servo_id):
+    try:
+        # start/end are unix timestamps, default is the last hour
+        end = request.args.get('end', type=float)
+        start = request.args.get('start', type=float)
+        if start is None:
+            start = (end or time.time()) - 3600
+        limit = request.args.get('limit', 1000, type=int)
+        if limit < 1:
+            return jsonify({'success': False, 'error': 'limit must be at least 1'})
+        limit = min(limit, 10000)
+        history = servo_controller.get_history(servo_id, start, end, limit)
+        return jsonify({'success': True, 'servo_id': servo_id, 'history': history})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -43,8 +147,8 @@ def get_servo_position(servo_id):
 @api_bp.route('/servos/positions', methods=['GET'])
 def get_all_positions():
     try:
-        positions = servo_controller.get_all_positions()
-        return jsonify({'success': True, 'positions': positions})
+        version, payload = servo_controller.get_positions_payload()
+        return versioned_response(payload, version)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
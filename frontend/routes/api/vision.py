@@ -0,0 +1,22 @@
+from flask import jsonify
+from . import api_bp
+
+# This will be set by the main app when VISION_ENABLED
+vision_pipeline = None
+
+def init_vision_pipeline(pipeline):
+    global vision_pipeline
+    vision_pipeline = pipeline
+
+@api_bp.route('/vision', methods=['GET'])
+def vision_status():
+    try:
+        if vision_pipeline is None:
+            return jsonify({'success': True, 'enabled': False})
+        return jsonify({
+            'success': True,
+            'enabled': True,
+            'stats': vision_pipeline.get_stats()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
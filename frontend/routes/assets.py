@@ -0,0 +1,175 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import Response, abort, current_app, render_template, request
+from werkzeug.security import safe_join
+
+from . import routes_bp
+
+# Brotli is optional - gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ASSET_MAX_AGE = 31536000  # One year, asset URLs change whenever their content does
+MIN_COMPRESS_SIZE = 512   # Bytes, smaller files are not worth compressing
+
+
+def _compress_variants(data):
+    """Build the precompressed variants of a body, keeping only those that are smaller"""
+    variants = {}
+    if len(data) >= MIN_COMPRESS_SIZE:
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(gz) < len(data):
+            variants['gzip'] = gz
+        if brotli is not None:
+            br = brotli.compress(data, quality=11)
+            if len(br) < len(data):
+                variants['br'] = br
+    return variants
+
+
+def _pick_encoding(variants):
+    """Choose the smallest precompressed variant the client accepts"""
+    accepted = [
+        (len(body), encoding) for encoding, body in variants.items()
+        if request.accept_encodings.quality(encoding) > 0
+    ]
+    if not accepted:
+        return None
+    return min(accepted)[1]
+
+
+def _make_response(body, variants, etag, mimetype, cache_control):
+    """
+    Conditional response (304 on ETag match) using a precompressed body when possible
+    Each encoding gets its own strong ETag (<etag>-<encoding>), since the bodies
+    differ byte for byte; a match on any of them means the content is unchanged.
+    """
+    encoding = _pick_encoding(variants)
+    tags = [etag] + [f"{etag}-{name}" for name in variants]
+    if any(request.if_none_match.contains(tag) for tag in tags):
+        response = Response(status=304)
+    else:
+        response = Response(variants[encoding] if encoding else body, mimetype=mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(f"{etag}-{encoding}" if encoding else etag)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+class StaticAsset:
+    """One static file with its content hash and precompressed variants"""
+
+    def __init__(self, filename, path):
+        self.filename = filename
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        with open(path, 'rb') as f:
+            self.body = f.read()
+        self.digest = hashlib.sha256(self.body).hexdigest()[:12]
+        self.variants = _compress_variants(self.body)
+        self.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+        base, ext = os.path.splitext(filename)
+        self.hashed_name = f"{base}.{self.digest}{ext}"
+
+
+class AssetPipeline:
+    """
+    Content-hashed, precompressed static assets
+
+    Every file in the static folder is served from /assets/<name>.<hash>.<ext>
+    with a one year immutable Cache-Control, so browsers only refetch after the
+    file actually changes. gzip (and brotli when installed) variants are built
+    once and picked according to Accept-Encoding.
+    """
+
+    def __init__(self):
+        self.assets = {}
+        self.hashed = {}
+        self.lock = threading.Lock()
+
+    def get(self, filename):
+        """Get asset by its plain filename, rebuilding it if the file changed on disk"""
+        path = safe_join(current_app.static_folder, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        with self.lock:
+            asset = self.assets.get(filename)
+            mtime = os.path.getmtime(path)
+            if asset is None or asset.mtime != mtime:
+                if asset is not None:
+                    self.hashed.pop(asset.hashed_name, None)
+                asset = StaticAsset(filename, path)
+                self.assets[filename] = asset
+                self.hashed[asset.hashed_name] = asset
+            return asset
+
+    def url_for(self, filename):
+        """URL of the content-hashed version of a static file"""
+        asset = self.get(filename)
+        if asset is None:
+            return f"/static/{filename}"
+        return f"/assets/{asset.hashed_name}"
+
+
+class PageCache:
+    """
+    Rendered templates with ETags and precompressed variants
+
+    Pages are re-rendered on every request while templates auto-reload
+    (debug mode), otherwise rendered once per process.
+    """
+
+    def __init__(self):
+        self.pages = {}
+        self.lock = threading.Lock()
+
+    def render(self, template_name):
+        cached = self.pages.get(template_name)
+        if cached is None or current_app.jinja_env.auto_reload:
+            body = render_template(template_name).encode('utf-8')
+            if cached is None or cached[0] != body:
+                cached = (body, _compress_variants(body), hashlib.sha256(body).hexdigest()[:16])
+                with self.lock:
+                    self.pages[template_name] = cached
+        return cached
+
+
+assets = AssetPipeline()
+pages = PageCache()
+
+
+@routes_bp.app_context_processor
+def inject_asset_url():
+    return {'asset_url': assets.url_for}
+
+
+def render_page(template_name):
+    """Render a template as a cacheable page that supports ETag/304 and compression"""
+    body, variants, etag = pages.render(template_name)
+    return _make_response(body, variants, etag, 'text/html', 'no-cache')
+
+
+@routes_bp.route('/assets/<filename>')
+def hashed_asset(filename):
+    """Serve a content-hashed static asset"""
+    asset = assets.hashed.get(filename)
+    if asset is None:
+        # Hash lookup may be stale after a restart, rebuild from the plain name
+        base, ext = os.path.splitext(filename)
+        plain = base.rsplit('.', 1)[0] + ext
+        asset = assets.get(plain)
+        if asset is None or asset.hashed_name != filename:
+            abort(404)
+    return _make_response(
+        asset.body, asset.variants, asset.digest, asset.mimetype,
+        f'public, max-age={ASSET_MAX_AGE}, immutable'
+    )
@@ -1,7 +1,7 @@
-from flask import render_template
 from . import routes_bp
+from .assets import render_page
 
 @routes_bp.route('/health')
 def health_page():
     """Serve the health monitoring page"""
-    return render_template('health.html')
\ No newline at end of file
+    return render_page('health.html')
\ No newline at end of file
@@ -1,7 +1,7 @@
-from flask import render_template
 from . import routes_bp
+from .assets import render_page
 
 @routes_bp.route('/')
 def index():
     """Serve the main control interface"""
-    return render_template('index.html')
\ No newline at end of file
+    return render_page('index.html')
\ No newline at end of file
@@ -1,12 +1,21 @@
-from flask import render_template
-import cv2
 import threading
 import base64
+import collections
+import itertools
 import time
-import psutil
 import json
 
+# cv2 and psutil are slow to import, so they are imported inside the functions
+# that use them and only load when the webcam or health pages are first opened
+
+from flask import Response, jsonify, request
+import backend.config as config
+from backend.log import get_logger
 from . import routes_bp
+from .assets import render_page
+
+webcam_logger = get_logger('webcam')
+health_logger = get_logger('health')
 
 # This will be set by the main app
 socketio = None
@@ -23,41 +32,48 @@ def init_socketio_and_controller(sio, controller):
 def register_socket_events():
     @socketio.on('connect', namespace='/webcam')
     def handle_webcam_connect():
-        print('WebSocket client connected to webcam namespace')
-        socketio.emit('status', {'message': 'Connected to webcam stream'}, namespace='/webcam')
+        webcam_logger.info('WebSocket client connected to webcam namespace')
+        socketio.emit('status', {'message': 'Connected to webcam stream'}, namespace='/webcam', to=request.sid)
+        socketio.emit('renditions', {
+            'renditions': describe_renditions(),
+            'default': config.WEBCAM_DEFAULT_RENDITION
+        }, namespace='/webcam', to=request.sid)
 
     @socketio.on('disconnect', namespace='/webcam')
     def handle_webcam_disconnect():
-        print('WebSocket client disconnected from webcam namespace')
-        streamer.stop_streaming()
+        webcam_logger.info('WebSocket client disconnected from webcam namespace')
+        streamer.remove_viewer(request.sid)
 
     @socketio.on('start_stream', namespace='/webcam')
     def handle_start_stream():
-        if not streamer.streaming_active:
-            streamer.start_streaming()
+        streamer.start_streaming(request.sid)
 
     @socketio.on('stop_stream', namespace='/webcam')
     def handle_stop_stream():
-        streamer.stop_streaming()
+        streamer.stop_streaming(request.sid)
 
     @socketio.on('update_settings', namespace='/webcam')
     def handle_update_settings(data):
-        if streamer.update_settings(data):
-            socketio.emit('settings_updated', {'success': True}, namespace='/webcam')
+        if streamer.update_settings(request.sid, data):
+            socketio.emit('settings_updated', {'success': True, **streamer.viewer_settings[request.sid]},
+                          namespace='/webcam', to=request.sid)
+            subscriber = streamer.subscribers.get(request.sid)
+            if subscriber:
+                socketio.emit('rendition', subscriber.describe(), namespace='/webcam', to=request.sid)
         else:
-            socketio.emit('error', {'message': 'Failed to update settings'}, namespace='/webcam')
+            socketio.emit('error', {'message': 'Failed to update settings'}, namespace='/webcam', to=request.sid)
 
     # Health monitoring events
     @socketio.on('connect', namespace='/health')
     def handle_health_connect():
-        print('WebSocket client connected to health namespace')
+        health_logger.info('WebSocket client connected to health namespace')
         # Send initial system info
         system_info = get_system_info()
         socketio.emit('system_info', system_info, namespace='/health')
 
     @socketio.on('disconnect', namespace='/health')
     def handle_health_disconnect():
-        print('WebSocket client disconnected from health namespace')
+        health_logger.info('WebSocket client disconnected from health namespace')
         stop_health_monitoring()
 
     @socketio.on('start_monitoring', namespace='/health')
@@ -70,6 +86,7 @@ def register_socket_events():
 
 def get_system_info():
     """Get static system information"""
+    import psutil
     return {
         'cpu_count': psutil.cpu_count(),
         'cpu_freq': round(psutil.cpu_freq().current) if psutil.cpu_freq() else 0,
@@ -78,6 +95,7 @@ def get_system_info():
 
 def get_health_data():
     """Get current CPU and RAM usage"""
+    import psutil
     cpu_percent = psutil.cpu_percent(interval=0.1)
     cpu_freq = psutil.cpu_freq()
     ram = psutil.virtual_memory()
@@ -122,100 +140,432 @@ def health_monitoring_loop():
             socketio.emit('health_data', data, namespace='/health')
             time.sleep(1)  # Update every second
         except Exception as e:
-            print(f"Error in health monitoring: {e}")
+            health_logger.error("Error in health monitoring: %s", e)
             break
     health_monitoring_active = False
 
+def describe_renditions():
+    """Rendition ladder from lowest to highest, as sent to clients"""
+    return [
+        {'name': name, 'resolution': '%dx%d' % settings['resolution'], 'quality': settings['quality']}
+        for name, settings in config.WEBCAM_RENDITIONS.items()
+    ]
+
+class EncodedFrame:
+    """One rendition of a captured frame, base64 encoded on first use"""
+    def __init__(self, jpeg):
+        self.jpeg = jpeg
+        self._b64 = None
+
+    @property
+    def b64(self):
+        if self._b64 is None:
+            self._b64 = base64.b64encode(self.jpeg).decode('ascii')
+        return self._b64
+
+class Subscriber:
+    """
+    One viewer: its rendition, frame interval and delivery counters
+
+    With rendition 'auto' the viewer moves down the ladder when too many of
+    its recent frames were dropped (it could not keep up), and back up after
+    WEBCAM_AUTO_UPGRADE_DELAY seconds without drops.
+    """
+    def __init__(self, rendition='auto', interval=None):
+        self.auto = True
+        self.rendition = config.WEBCAM_DEFAULT_RENDITION
+        self.interval = config.WEBCAM_FRAME_INTERVAL
+        self.configure(rendition, interval)
+        self.next_due = 0.0
+        self.sent = 0
+        self.dropped = 0
+        self.window = collections.deque(maxlen=config.WEBCAM_AUTO_WINDOW)
+        self.last_change = time.monotonic()
+
+    def configure(self, rendition, interval=None):
+        if rendition == 'auto':
+            self.auto = True
+        elif rendition in config.WEBCAM_RENDITIONS:
+            self.auto = False
+            self.rendition = rendition
+        if interval:
+            self.interval = interval
+
+    def ready(self):
+        """False while the viewer has not taken the previous frames yet"""
+        return True
+
+    def deliver(self, frame):
+        raise NotImplementedError
+
+    def switched(self):
+        """Called after auto switching changed the rendition"""
+        pass
+
+    def close(self):
+        pass
+
+    def record(self, delivered):
+        """Count a frame and apply auto switching; returns True if the rendition changed"""
+        if delivered:
+            self.sent += 1
+        else:
+            self.dropped += 1
+        self.window.append(delivered)
+        if not self.auto or len(self.window) < self.window.maxlen:
+            return False
+
+        ladder = list(config.WEBCAM_RENDITIONS)
+        index = ladder.index(self.rendition)
+        drop_ratio = self.window.count(False) / len(self.window)
+        now = time.monotonic()
+        if drop_ratio >= config.WEBCAM_AUTO_DOWNGRADE and index > 0:
+            index -= 1
+        elif drop_ratio == 0 and index < len(ladder) - 1 and now - self.last_change >= config.WEBCAM_AUTO_UPGRADE_DELAY:
+            index += 1
+        else:
+            return False
+        self.rendition = ladder[index]
+        self.window.clear()
+        self.last_change = now
+        return True
+
+    def describe(self):
+        settings = config.WEBCAM_RENDITIONS[self.rendition]
+        return {
+            'rendition': self.rendition,
+            'auto': self.auto,
+            'resolution': '%dx%d' % settings['resolution'],
+            'quality': settings['quality'],
+            'latency': self.interval
+        }
+
+    def get_stats(self):
+        return {**self.describe(), 'sent': self.sent, 'dropped': self.dropped}
+
+class SocketSubscriber(Subscriber):
+    """Socket.IO viewer; frames it has not acknowledged yet count as in flight"""
+    def __init__(self, sid, rendition='auto', interval=None):
+        super().__init__(rendition, interval)
+        self.sid = sid
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def ready(self):
+        return self.in_flight < config.WEBCAM_MAX_IN_FLIGHT
+
+    def deliver(self, frame):
+        with self.lock:
+            self.in_flight += 1
+        socketio.emit('video_frame', {'frame': frame.b64, 'rendition': self.rendition},
+                      namespace='/webcam', to=self.sid, callback=self._ack)
+
+    def _ack(self, *args):
+        with self.lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def switched(self):
+        socketio.emit('rendition', self.describe(), namespace='/webcam', to=self.sid)
+
+class MjpegSubscriber(Subscriber):
+    """MJPEG viewer; holds one frame until the response generator has written it"""
+    def __init__(self, rendition='auto', interval=None):
+        super().__init__(rendition, interval)
+        self.cond = threading.Condition()
+        self.frame = None
+        self.closed = False
+
+    def ready(self):
+        return self.frame is None
+
+    def deliver(self, frame):
+        with self.cond:
+            self.frame = frame.jpeg
+            self.cond.notify()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+    def next_frame(self, timeout=5.0):
+        """Next JPEG, or None on timeout or when the stream ended"""
+        with self.cond:
+            self.cond.wait_for(lambda: self.frame is not None or self.closed, timeout)
+            frame, self.frame = self.frame, None
+            return frame
+
 class WebcamStreamer:
+    """
+    Captures camera frames and serves them to each viewer in its own rendition
+
+    Every rendition in WEBCAM_RENDITIONS is encoded at most once per captured
+    frame, and only if a viewer that is due for a frame has selected it, so a
+    low bandwidth viewer neither lowers the quality nor adds encoding work for
+    the others. Viewers that fall behind have frames dropped instead of queued.
+    """
     def __init__(self):
         self.camera = None
         self.camera_lock = threading.Lock()
-        self.streaming_active = False
         self.stream_thread = None
-        self.settings = {
-            'resolution': (640, 480),
-            'latency': 0.033,  # ~30 FPS
-            'quality': 80
-        }
-
-    def update_settings(self, new_settings):
-        """Update streaming settings"""
+        self.frame_listeners = []
+        self.subscribers = {}
+        self.subscribers_lock = threading.Lock()
+        self.viewer_settings = {}   # Socket.IO sid -> settings for its next start_stream
+        self.encoded = dict.fromkeys(config.WEBCAM_RENDITIONS, 0)
+
+    @property
+    def streaming_active(self):
+        return bool(self.subscribers)
+
+    def update_settings(self, sid, new_settings):
+        """
+        Update one viewer's settings
+        rendition: 'auto' or a WEBCAM_RENDITIONS name; latency: seconds between frames.
+        An explicit resolution (older clients) selects the rendition with that resolution.
+        """
         try:
-            # Parse resolution
-            width, height = map(int, new_settings.get('resolution', '640x480').split('x'))
-            self.settings['resolution'] = (width, height)
-
-            # Update other settings
-            self.settings['latency'] = float(new_settings.get('latency', 0.033))
-            self.settings['quality'] = int(new_settings.get('quality', 80))
-
-            print(f"Updated webcam settings: {self.settings}")
+            rendition = new_settings.get('rendition')
+            if rendition is None and 'resolution' in new_settings:
+                width, height = map(int, new_settings['resolution'].split('x'))
+                rendition = next(
+                    (name for name, settings in config.WEBCAM_RENDITIONS.items()
+                     if settings['resolution'] == (width, height)), 'auto'
+                )
+            rendition = rendition or 'auto'
+            if rendition != 'auto' and rendition not in config.WEBCAM_RENDITIONS:
+                raise ValueError(f"Unknown rendition: {rendition}")
+            latency = float(new_settings.get('latency', config.WEBCAM_FRAME_INTERVAL))
+
+            self.viewer_settings[sid] = {'rendition': rendition, 'latency': latency}
+            subscriber = self.subscribers.get(sid)
+            if subscriber:
+                subscriber.configure(rendition, latency)
+            webcam_logger.info("Updated webcam settings for %s: %s", sid, self.viewer_settings[sid])
             return True
         except Exception as e:
-            print(f"Error updating settings: {e}")
+            webcam_logger.warning("Error updating settings: %s", e)
             return False
 
     def get_camera(self):
+        import cv2
         with self.camera_lock:
             if self.camera is None or not self.camera.isOpened():
-                self.camera = cv2.VideoCapture(0)
+                if config.WEBCAM_SOURCE == 'synthetic':
+                    from backend.simulator import SyntheticCamera
+                    self.camera = SyntheticCamera()
+                else:
+                    self.camera = cv2.VideoCapture(config.WEBCAM_SOURCE)
+                    # Capture at the top rung so it is not an upscaled frame
+                    width, height = max(settings['resolution'] for settings in config.WEBCAM_RENDITIONS.values())
+                    self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                    self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
                 if not self.camera.isOpened():
                     raise RuntimeError("Could not start camera.")
             return self.camera
 
-    def start_streaming(self):
-        if self.streaming_active:
+    def add_frame_listener(self, listener):
+        """
+        Call listener(frame, captured_at) with every captured BGR frame
+        Runs on the capture thread, so listeners must return quickly. The
+        camera keeps capturing while a listener is registered, even without viewers.
+        """
+        with self.subscribers_lock:
+            self.frame_listeners.append(listener)
+            self._start_capture()
+
+    def remove_frame_listener(self, listener):
+        with self.subscribers_lock:
+            if listener in self.frame_listeners:
+                self.frame_listeners.remove(listener)
+
+    def subscribe(self, key, subscriber):
+        with self.subscribers_lock:
+            self.subscribers[key] = subscriber
+            self._start_capture()
+
+    def unsubscribe(self, key):
+        with self.subscribers_lock:
+            subscriber = self.subscribers.pop(key, None)
+        if subscriber:
+            subscriber.close()
+        return subscriber
+
+    def _start_capture(self):
+        # Called with subscribers_lock held
+        if self.stream_thread is None:
+            self.stream_thread = threading.Thread(target=self.stream_video)
+            self.stream_thread.daemon = True
+            self.stream_thread.start()
+
+    def start_streaming(self, sid):
+        if sid in self.subscribers:
             return
 
-        self.streaming_active = True
-        self.stream_thread = threading.Thread(target=self.stream_video)
-        self.stream_thread.daemon = True
-        self.stream_thread.start()
-        socketio.emit('status', {'message': 'Stream started'}, namespace='/webcam')
-
-    def stop_streaming(self):
-        self.streaming_active = False
-        if self.stream_thread and self.stream_thread.is_alive():
-            self.stream_thread.join(timeout=1.0)
-        socketio.emit('status', {'message': 'Stream stopped'}, namespace='/webcam')
-
-    def stream_video(self):
-        try:
-            camera = self.get_camera()
-            while self.streaming_active:
-                success, frame = camera.read()
-                if not success:
-                    socketio.emit('error', {'message': 'Failed to read frame from camera'}, namespace='/webcam')
-                    break
-
-                # Resize frame based on current settings
-                width, height = self.settings['resolution']
-                frame = cv2.resize(frame, (width, height))
-
-                # Encode frame as JPEG with current quality setting
-                ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.settings['quality']])
-                if not ret:
-                    continue
-
-                # Convert to base64 for WebSocket transmission
-                frame_data = base64.b64encode(buffer).decode('utf-8')
+        settings = self.viewer_settings.get(sid, {})
+        subscriber = SocketSubscriber(sid, settings.get('rendition', 'auto'), settings.get('latency'))
+        self.subscribe(sid, subscriber)
+        socketio.emit('status', {'message': 'Stream started'}, namespace='/webcam', to=sid)
+        socketio.emit('rendition', subscriber.describe(), namespace='/webcam', to=sid)
+
+    def stop_streaming(self, sid):
+        self.unsubscribe(sid)
+        socketio.emit('status', {'message': 'Stream stopped'}, namespace='/webcam', to=sid)
+
+    def remove_viewer(self, sid):
+        self.unsubscribe(sid)
+        self.viewer_settings.pop(sid, None)
+
+    def get_stats(self):
+        """Encoded frames per rendition and per-viewer sent / dropped counters"""
+        with self.subscribers_lock:
+            subscribers = dict(self.subscribers)
+        return {
+            'encoded': dict(self.encoded),
+            'viewers': {key: subscriber.get_stats() for key, subscriber in subscribers.items()}
+        }
 
-                # Emit frame to client
-                socketio.emit('video_frame', {'frame': frame_data}, namespace='/webcam')
+    def _encode(self, frame, rendition):
+        import cv2
+        settings = config.WEBCAM_RENDITIONS[rendition]
+        width, height = settings['resolution']
+        if frame.shape[1] != width or frame.shape[0] != height:
+            frame = cv2.resize(frame, (width, height))
+        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, settings['quality']])
+        if not ret:
+            return None
+        self.encoded[rendition] += 1
+        return EncodedFrame(buffer.tobytes())
+
+    def _publish(self, frame):
+        """Encode the renditions due viewers need (once each) and hand out the frame"""
+        now = time.monotonic()
+        with self.subscribers_lock:
+            due = [subscriber for subscriber in self.subscribers.values() if subscriber.next_due <= now]
+
+        encoded = {}
+        for subscriber in due:
+            # Keep the average rate without bursting after a stall
+            subscriber.next_due = max(subscriber.next_due + subscriber.interval, now - subscriber.interval)
+            if not subscriber.ready():
+                delivered = False
+            else:
+                rendition = subscriber.rendition
+                if rendition not in encoded:
+                    encoded[rendition] = self._encode(frame, rendition)
+                delivered = encoded[rendition] is not None
+                if delivered:
+                    subscriber.deliver(encoded[rendition])
+            if subscriber.record(delivered):
+                webcam_logger.info("Viewer switched to %s rendition", subscriber.rendition)
+                subscriber.switched()
+
+    def _next_wait(self):
+        with self.subscribers_lock:
+            due_times = [subscriber.next_due for subscriber in self.subscribers.values()]
+        if not due_times:
+            return config.WEBCAM_FRAME_INTERVAL
+        return min(config.WEBCAM_FRAME_INTERVAL, max(0.0, min(due_times) - time.monotonic()))
+
+    def _keep_capturing(self):
+        """True while anyone needs frames; otherwise marks the capture thread as finished"""
+        with self.subscribers_lock:
+            if self.subscribers or self.frame_listeners:
+                return True
+            self.stream_thread = None
+            return False
 
-                # Small delay to control frame rate based on latency setting
-                time.sleep(self.settings['latency'])
+    def _release_camera(self):
+        with self.camera_lock:
+            if self.camera is not None:
+                self.camera.release()
+                self.camera = None
 
-        except Exception as e:
-            print(f"Error in video streaming: {e}")
-            socketio.emit('error', {'message': str(e)}, namespace='/webcam')
-        finally:
-            self.streaming_active = False
+    def stream_video(self):
+        """
+        Capture loop, runs while there are viewers or frame listeners
+        When the camera fails it is released and the viewers' streams end.
+        Frame listeners (the vision pipeline) cannot restart capture, so while
+        any are registered the camera is reopened with exponential backoff.
+        """
+        retry_delay = config.WEBCAM_RETRY_DELAY
+        while True:
+            try:
+                camera = self.get_camera()
+                while self._keep_capturing():
+                    success, frame = camera.read()
+                    captured_at = time.perf_counter()
+                    if not success:
+                        raise RuntimeError("Failed to read frame from camera")
+                    retry_delay = config.WEBCAM_RETRY_DELAY
+
+                    for listener in list(self.frame_listeners):
+                        listener(frame, captured_at)
+
+                    self._publish(frame)
+
+                    # Wait until the next viewer is due
+                    time.sleep(self._next_wait())
+                return
+
+            except Exception as e:
+                webcam_logger.error("Error in video streaming: %s", e)
+                socketio.emit('error', {'message': str(e)}, namespace='/webcam')
+            self._release_camera()
+
+            # Capture failed: end every viewer's stream
+            with self.subscribers_lock:
+                subscribers = list(self.subscribers.values())
+                self.subscribers.clear()
+                listeners = len(self.frame_listeners)
+            for subscriber in subscribers:
+                subscriber.close()
+            if not self._keep_capturing():
+                return
+            webcam_logger.error(
+                "Camera unavailable with %d frame listeners registered, retrying in %.1f s", listeners, retry_delay
+            )
+            time.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, config.WEBCAM_RETRY_MAX_DELAY)
+            if not self._keep_capturing():
+                return
 
 # Create global streamer instance
 streamer = WebcamStreamer()
 
+mjpeg_ids = itertools.count(1)
+
 @routes_bp.route('/webcam')
 def webcam():
     """Serve the webcam streaming page"""
-    return render_template('webcam.html')
\ No newline at end of file
+    return render_page('webcam.html')
+
+@routes_bp.route('/webcam/stream.mjpg')
+def webcam_mjpeg():
+    """
+    Motion JPEG stream, e.g. for an <img> tag
+    Query: rendition (a WEBCAM_RENDITIONS name or auto) and fps
+    """
+    fps = request.args.get('fps', type=float)
+    subscriber = MjpegSubscriber(request.args.get('rendition', 'auto'), 1.0 / fps if fps else None)
+    key = f"mjpeg-{next(mjpeg_ids)}"
+
+    def generate():
+        streamer.subscribe(key, subscriber)
+        try:
+            while not subscriber.closed:
+                jpeg = subscriber.next_frame()
+                if jpeg is None:
+                    continue
+                yield (b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: ' + str(len(jpeg)).encode()
+                       + b'\r\n\r\n' + jpeg + b'\r\n')
+        finally:
+            streamer.unsubscribe(key)
+
+    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame',
+                    headers={'Cache-Control': 'no-cache'})
+
+@routes_bp.route('/webcam/stats')
+def webcam_stats():
+    """Encoded frames per rendition and per-viewer delivery counters"""
+    return jsonify({'success': True, **streamer.get_stats()})
\ No newline at end of file
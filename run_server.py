@@ -4,11 +4,55 @@ Development server runner for Multi-Servo Controller
 Run this file to start the development server with enhanced logging and auto-reload
 """
 
+import argparse
 import os
+import socket
 import sys
-from frontend import app, socketio, servo_controller, cleanup
+import time
 import backend.config as config
 
+# The app is imported in main() so its import time can be profiled
+app = socketio = servo_controller = cleanup = start_config_watcher = start_vision = None
+
+class StartupProfiler:
+    """Collects the duration of each startup phase for --profile-startup"""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = []
+    
+    def phase(self, name, start):
+        """Record a phase that began at start (a time.perf_counter() value)"""
+        self.phases.append((name, time.perf_counter() - start))
+    
+    def report(self):
+        print("\n⏱️  STARTUP PROFILE:")
+        print("-" * 40)
+        for name, duration in self.phases:
+            print(f"{name:<28} {duration * 1000:>8.1f} ms")
+        print("-" * 40)
+        print(f"{'Total to ready':<28} {(time.perf_counter() - self.start) * 1000:>8.1f} ms")
+        print("-" * 40)
+
+def import_app(profiler):
+    """Import the controller backend and the Flask app, timing each"""
+    global app, socketio, servo_controller, cleanup, start_config_watcher, start_vision
+    start = time.perf_counter()
+    from backend.log import setup_logging
+    setup_logging()
+    profiler.phase("Logging setup", start)
+    
+    start = time.perf_counter()
+    import backend.servo_controller
+    profiler.phase("Import backend (+hw libs)", start)
+    
+    start = time.perf_counter()
+    import frontend
+    profiler.phase("Import frontend (Flask)", start)
+    
+    app, socketio, servo_controller, cleanup = frontend.app, frontend.socketio, frontend.servo_controller, frontend.cleanup
+    start_config_watcher, start_vision = frontend.start_config_watcher, frontend.start_vision
+
 def print_banner():
     """Print startup banner"""
     print("="*60)
@@ -55,34 +99,54 @@ def print_access_info():
     print("-" * 40)
 
 def get_local_ip():
-    """Get local IP address"""
+    """
+    Get local IP address
+    Asks the kernel for the first non-loopback interface address instead of
+    routing a socket toward the internet, so it is instant right after boot
+    """
     try:
-        import socket
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
-    except:
-        return "your-pi-ip"
+        import fcntl
+        import struct
+        SIOCGIFADDR = 0x8915
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            for _, name in socket.if_nameindex():
+                if name == 'lo':
+                    continue
+                try:
+                    packed = fcntl.ioctl(s.fileno(), SIOCGIFADDR, struct.pack('256s', name[:15].encode()))
+                    return socket.inet_ntoa(packed[20:24])
+                except OSError:
+                    continue  # Interface has no IPv4 address
+    except (ImportError, OSError):
+        pass
+    # Raspberry Pi OS advertises the hostname over mDNS
+    return f"{socket.gethostname()}.local"
 
 def check_dependencies():
     """Check if all required dependencies are available"""
-    try:
-        import board
-        import busio
-        import adafruit_pca9685
+    import backend.servo_controller
+    if backend.servo_controller.HARDWARE_AVAILABLE:
         print("✅ Hardware libraries available")
         return True
-    except:
+    else:
         print("⚠️  Hardware libraries not found - running in MOCK MODE")
         print("💡 For hardware support install: pip install -r requirements.txt")
         return "mock"
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Multi-Servo Controller development server")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Print import and initialization time per startup phase")
+    return parser.parse_args()
+
 def main():
     """Main entry point"""
+    args = parse_args()
+    profiler = StartupProfiler()
     print_banner()
     
+    import_app(profiler)
+    
     # Check dependencies
     dep_status = check_dependencies()
     if dep_status is False:  # Only exit if there's a real error
@@ -94,7 +158,13 @@ def main():
             print("⚠️  Running in MOCK MODE - No hardware control available")
             print("💡 All servo operations will be simulated")
         
+        start = time.perf_counter()
         servo_controller.initialize()
+        profiler.phase("Controller init (total)", start)
+        for name, duration in servo_controller.init_timings.items():
+            profiler.phases.append((f"  {name}", duration))
+        start_config_watcher()
+        start_vision()
         print("✅ System initialization complete")
         
         print_servo_status()
@@ -103,6 +173,9 @@ def main():
         if dep_status == "mock":
             print("\n⚠️  MOCK MODE ACTIVE - Hardware control disabled")
         
+        if args.profile_startup:
+            profiler.report()
+        
         print("\n🚀 STARTING WEB SERVER...")
         print("Press Ctrl+C to stop the server\n")
         
@@ -124,7 +197,8 @@ def main():
             print("Check your hardware connections and try again")
         
     finally:
-        cleanup()
+        if cleanup is not None:
+            cleanup()
         print("👋 Server stopped. Goodbye!")
 
 if __name__ == '__main__':
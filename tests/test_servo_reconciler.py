@@ -0,0 +1,124 @@
+"""Config reconciler: apply_servo_configs / update_servo_config on the mock PCA9685"""
+
+import copy
+import json
+import os
+import tempfile
+import unittest
+
+import backend.config as config
+from backend.servo_controller import MultiServoController
+
+SERVO_CONFIGS = {
+    'fill': {
+        'name': 'Fill', 'channel': 0, 'min_angle': 0, 'max_angle': 180,
+        'min_pulse_us': 500, 'max_pulse_us': 2500, 'default_angle': 90, 'enabled': True
+    },
+    'drain': {
+        'name': 'Drain', 'channel': 1, 'min_angle': 0, 'max_angle': 180,
+        'min_pulse_us': 500, 'max_pulse_us': 2500, 'default_angle': 45, 'enabled': True
+    },
+}
+
+
+class ServoReconcilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = {
+            name: getattr(config, name)
+            for name in ('SERVO_CONFIG_FILE', 'ACTUATION_LOG_ENABLED', 'CONFIG_WATCH_ENABLED', 'SIMULATE_HARDWARE')
+        }
+        self.tmpdir = tempfile.TemporaryDirectory()
+        config.SERVO_CONFIG_FILE = os.path.join(self.tmpdir.name, 'servo_configs.json')
+        config.ACTUATION_LOG_ENABLED = False
+        config.CONFIG_WATCH_ENABLED = False
+        config.SIMULATE_HARDWARE = False
+        with open(config.SERVO_CONFIG_FILE, 'w') as f:
+            json.dump(SERVO_CONFIGS, f)
+
+        self.controller = MultiServoController()
+        self.controller.mock_mode = True
+        self.controller.initialize()
+
+    def tearDown(self):
+        self.controller.cleanup()
+        for name, value in self.saved.items():
+            setattr(config, name, value)
+        self.tmpdir.cleanup()
+
+    def configs(self, **changes):
+        """Copy of the running configs with some fields of some servos changed"""
+        new_configs = copy.deepcopy(self.controller.servo_configs)
+        for servo_id, fields in changes.items():
+            new_configs[servo_id].update(fields)
+        return new_configs
+
+    def duty_cycle(self, channel):
+        return self.controller.pca.channels[channel].duty_cycle
+
+    def test_name_only_change_writes_nothing(self):
+        self.controller.set_angle('fill', 120)
+        version = self.controller.version
+
+        changes = self.controller.apply_servo_configs(self.configs(fill={'name': 'Fill tank'}))
+
+        self.assertEqual(changes['updated'], {'fill': ['name']})
+        self.assertEqual(changes['outputs'], 0)
+        self.assertEqual(self.controller.get_position('fill'), 120)
+        self.assertEqual(self.controller.servo_configs['fill']['name'], 'Fill tank')
+        self.assertGreater(self.controller.version, version)
+
+    def test_channel_move_keeps_position_and_releases_old_channel(self):
+        self.controller.set_angle('fill', 120)
+        duty_cycle = self.duty_cycle(0)
+
+        changes = self.controller.apply_servo_configs(self.configs(fill={'channel': 5}))
+
+        self.assertEqual(changes['updated'], {'fill': ['channel']})
+        self.assertEqual(changes['outputs'], 2)
+        self.assertEqual(self.duty_cycle(0), 0)
+        self.assertEqual(self.duty_cycle(5), duty_cycle)
+        self.assertIs(self.controller.servos['fill']['channel'], self.controller.pca.channels[5])
+        self.assertEqual(self.controller.get_position('fill'), 120)
+
+    def test_invalid_entry_is_rejected_and_keeps_old_config(self):
+        old_config = dict(self.controller.servo_configs['fill'])
+
+        success, message = self.controller.update_servo_config('fill', {'min_pulse_us': 'a'})
+
+        self.assertFalse(success)
+        self.assertIn('min_pulse_us', message)
+        self.assertEqual(self.controller.servo_configs['fill'], old_config)
+        self.assertEqual(self.controller.servos['fill']['config'], old_config)
+        self.assertEqual(self.controller.set_angle('fill', 100), (True, 100))
+
+    def test_rejected_entry_does_not_block_the_others(self):
+        new_configs = self.configs(drain={'default_angle': 200}, fill={'max_angle': 170})
+        new_configs['bad'] = 5
+
+        changes = self.controller.apply_servo_configs(new_configs)
+
+        self.assertEqual(set(changes['rejected']), {'drain', 'bad'})
+        self.assertEqual(changes['updated'], {'fill': ['max_angle']})
+        self.assertEqual(self.controller.servo_configs['drain'], SERVO_CONFIGS['drain'])
+        self.assertNotIn('bad', self.controller.servo_configs)
+
+    def test_channel_taken_by_rejected_servo_is_not_handed_out(self):
+        # drain is renamed (fine) and fill moves onto drain's channel (conflict)
+        changes = self.controller.apply_servo_configs(
+            self.configs(fill={'channel': 1}, drain={'name': 'Drain 2'})
+        )
+
+        self.assertEqual(list(changes['rejected']), ['fill'])
+        self.assertEqual(changes['updated'], {'drain': ['name']})
+        self.assertEqual(self.controller.servo_configs['fill']['channel'], 0)
+
+    def test_non_object_payload_is_rejected(self):
+        changes = self.controller.apply_servo_configs([])
+
+        self.assertIn('*', changes['rejected'])
+        self.assertEqual(self.controller.servo_configs, SERVO_CONFIGS)
+
+
+if __name__ == '__main__':
+    unittest.main()